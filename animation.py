@@ -0,0 +1,24 @@
+# === Chiavi di animazione ===
+# Entities keep their facing direction and animation as small ints and look
+# frames up in tuples built once at load time, instead of formatting and
+# hashing f"{state}_{direction}" names every tick. The names only exist to
+# find the frames in the loaded animations dict.
+LEFT, RIGHT = 0, 1
+DIRECTIONS = ("left", "right")  # asset suffix of each direction id
+
+
+def table(state_count):
+    """direction -> state -> animation id; ids run through every state of
+    LEFT, then every state of RIGHT."""
+    return tuple(tuple(range(d * state_count, (d + 1) * state_count)) for d in range(len(DIRECTIONS)))
+
+
+def names(states, extra=()):
+    """Animation names in id order: the directional states as numbered by
+    table(len(states)), then the undirected extras."""
+    return tuple(f"{state}_{direction}" for direction in DIRECTIONS for state in states) + tuple(extra)
+
+
+def frames(animations, names):
+    """Frame lists of the loaded animations dict, indexed by animation id."""
+    return tuple(animations[name] for name in names)
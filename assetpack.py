@@ -0,0 +1,172 @@
+import pygame
+import json
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import time
+
+import atlas
+
+# === Asset pack pre-convertito ===
+# Single binary file with every frame stored as raw BGRA bytes (the
+# pygame.image.tobytes layout), both at its native size and at the size the
+# game actually draws it. At runtime the file is mmap()ed and frames become
+# surfaces through pygame.image.frombuffer: no PNG decode, no rescale.
+# BGRA matches SDL's usual ARGB8888 display format, so the surfaces blit as
+# fast as convert_alpha()ed ones without a copy; on a display with another
+# layout they are converted once when handed out.
+#
+# Layout: MAGIC | u32 version | u32 index length | index (JSON) | pixel data.
+# The index lists [name, width, height, offset]; offsets are relative to the
+# pixel data, which starts at the first ALIGN boundary after the index.
+IMAGES_DIR = "images"
+PACK_FILE = "assets.pack"
+MAGIC = b"SSPK"
+VERSION = 2
+HEADER = struct.Struct("<4sII")
+PIXEL_FORMAT = "BGRA"
+ALIGN = 16
+
+# In-game sizes that differ from "32x32 art drawn at 64x64".
+# None means the frame is only used at its native size.
+SIZE_OVERRIDES = {
+    "bloop/attacks/long": None,
+    "blub/mini-blub/": (32, 32),
+    "plu/salsa": (32, 32),
+    "globulus/attacks/slime_ball": (32, 32),
+}
+DEFAULT_SCALE = 2
+
+
+def game_size(name, native_size):
+    for prefix, size in SIZE_OVERRIDES.items():
+        if name == prefix or (prefix.endswith("/") and name.startswith(prefix)):
+            return size
+    return (native_size[0] * DEFAULT_SCALE, native_size[1] * DEFAULT_SCALE)
+
+
+def data_start(index_len):
+    start = HEADER.size + index_len
+    return start + (-start % ALIGN)
+
+
+def build(root=IMAGES_DIR):
+    """Packs every atlas source frame at native and in-game size. Returns surface count."""
+    blobs = []
+    for name, path in atlas.collect(root):
+        image = pygame.image.load(path)
+        blobs.append((name, image))
+        size = game_size(name, image.get_size())
+        if size is not None and size != image.get_size():
+            blobs.append((name, pygame.transform.scale(image, size)))
+
+    entries = []
+    offset = 0
+    for name, image in blobs:
+        width, height = image.get_size()
+        entries.append([name, width, height, offset])
+        offset += width * height * 4
+        offset += -offset % ALIGN
+    index = json.dumps({"format": PIXEL_FORMAT, "entries": entries}).encode()
+    base = data_start(len(index))
+
+    with open(os.path.join(root, PACK_FILE), "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(index)))
+        f.write(index)
+        for (name, image), (_, _, _, offset) in zip(blobs, entries):
+            f.seek(base + offset)
+            f.write(pygame.image.tobytes(image, PIXEL_FORMAT))
+    return len(entries)
+
+
+class AssetPack:
+    """Read-only mmap view of an asset pack, keyed by (name, size)."""
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_len = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} asset pack")
+        index = json.loads(bytes(self.data[HEADER.size:HEADER.size + index_len]))
+        base = data_start(index_len)
+        self.format = index["format"]
+        self.entries = {}
+        self.native = {}
+        for name, width, height, offset in index["entries"]:
+            self.entries[(name, (width, height))] = base + offset
+            self.native.setdefault(name, (width, height))  # native size is packed first
+        self.view = memoryview(self.data)
+
+    def __contains__(self, name):
+        return name in self.native
+
+    def has(self, name, size):
+        return (name, size) in self.entries
+
+    def surface(self, name, size=None):
+        if size is None:
+            size = self.native[name]
+        offset = self.entries[(name, size)]
+        surface = pygame.image.frombuffer(self.view[offset:offset + size[0] * size[1] * 4], size, self.format)
+        display = pygame.display.get_surface()
+        if display is not None and surface.get_masks()[:3] != display.get_masks()[:3]:
+            surface = surface.convert_alpha()
+        return surface
+
+
+def load(root=IMAGES_DIR):
+    """Returns the AssetPack for root, or None when it has not been built."""
+    path = os.path.join(root, PACK_FILE)
+    if not os.path.exists(path):
+        return None
+    return AssetPack(path)
+
+
+# === Confronto tempi di avvio ===
+def time_startup(mode):
+    """Builds Bloop and the three bosses from a cold cache; returns milliseconds."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import assets
+    assets.cache.use_pack = mode == "pack"
+    assets.cache.use_atlas = False
+    import window
+    window.open()
+    start = time.perf_counter()
+    from bloop import Bloop
+    from sirBlub import SirBlub
+    from chefPlu2 import ChefPlu
+    from reglobulus import ReGlobulus
+    Bloop(100, 536)
+    SirBlub(400, 536)
+    ChefPlu(400, 536)
+    ReGlobulus(400, 536)
+    return (time.perf_counter() - start) * 1000
+
+
+def compare(runs=5):
+    results = {}
+    for mode in ("png", "pack"):
+        times = []
+        for _ in range(runs):
+            out = subprocess.run([sys.executable, __file__, "time", mode], capture_output=True, text=True, check=True)
+            times.append(float(out.stdout.strip().splitlines()[-1]))
+        results[mode] = min(times)
+        print(f"{mode:>4}: best of {runs} = {results[mode]:.1f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if command == "build":
+        root = sys.argv[2] if len(sys.argv) > 2 else IMAGES_DIR
+        count = build(root)
+        print(f"Packed {count} surfaces into {os.path.join(root, PACK_FILE)}")
+    elif command == "compare":
+        compare()
+    elif command == "time":
+        print(time_startup(sys.argv[2]))
+    else:
+        print("usage: python assetpack.py [build [images_dir] | compare]")
+        sys.exit(1)
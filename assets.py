@@ -0,0 +1,212 @@
+import pygame
+import os
+import threading
+from collections import OrderedDict
+import atlas
+import assetpack
+
+# === Cache condivisa degli sprite ===
+# Every PNG under images/ is decoded and convert_alpha()ed exactly once per
+# process; all entities share the resulting surfaces. Logical names are the
+# path under images/ without the extension, e.g. "blub/idle_left/frame_0".
+# When the atlas has been built (python atlas.py) frames are subsurfaces of
+# the single decoded sheet; anything not in the atlas is read from its PNG.
+# A pre-converted asset pack (python assetpack.py) takes precedence over both.
+# Both caches share one lock, so the menu's preloader (preload.py) can fill
+# them from a worker thread while the game reads them.
+IMAGES_DIR = "images"
+MAX_FRAMES = 10  # stesso limite usato da Bloop.load_animations
+DERIVED_MAX_BYTES = 8 * 1024 * 1024  # budget per le varianti scalate/specchiate
+
+
+class AssetCache:
+    """Process-wide registry of decoded sprite surfaces with hit/miss counters."""
+    def __init__(self, root=IMAGES_DIR):
+        self.root = root
+        self.surfaces = {}
+        self.hits = 0
+        self.misses = 0
+        self.file_loads = 0
+        self.atlas = None
+        self.atlas_checked = False
+        self.pack = None
+        self.pack_checked = False
+        self.use_atlas = True
+        self.use_pack = True
+        self.lock = threading.RLock()
+
+    def path(self, name):
+        return os.path.join(self.root, *name.split("/")) + ".png"
+
+    def get_pack(self):
+        if self.use_pack and not self.pack_checked:
+            self.pack_checked = True
+            self.pack = assetpack.load(self.root)
+            if self.pack is not None:
+                self.file_loads += 1
+        return self.pack
+
+    def get_atlas(self):
+        if self.use_atlas and not self.atlas_checked:
+            self.atlas_checked = True
+            self.atlas = atlas.load(self.root)
+            if self.atlas is not None:
+                self.file_loads += 1
+        return self.atlas
+
+    def exists(self, name):
+        with self.lock:
+            if name in self.surfaces:
+                return True
+            pack = self.get_pack()
+            if pack is not None and name in pack:
+                return True
+            sheet = self.get_atlas()
+            if sheet is not None and name in sheet:
+                return True
+        return os.path.exists(self.path(name))
+
+    def image(self, name):
+        with self.lock:
+            surface = self.surfaces.get(name)
+            if surface is not None:
+                self.hits += 1
+                return surface
+            self.misses += 1
+            pack = self.get_pack()
+            if pack is not None and name in pack:
+                surface = pack.surface(name)
+            elif self.get_atlas() is not None and name in self.atlas:
+                surface = self.atlas.image(name)
+            else:
+                self.file_loads += 1
+                surface = pygame.image.load(self.path(name)).convert_alpha()
+            self.surfaces[name] = surface
+            return surface
+
+    def frames(self, animation, indices=None):
+        """Returns the frames of an animation folder.
+
+        With no indices, loads frame_0, frame_1, ... until the first missing file.
+        """
+        if indices is not None:
+            return [self.image(f"{animation}/frame_{i}") for i in indices]
+        frames = []
+        for i in range(MAX_FRAMES):
+            name = f"{animation}/frame_{i}"
+            if not self.exists(name):
+                break
+            frames.append(self.image(name))
+        return frames
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "surfaces": len(self.surfaces),
+            "file_loads": self.file_loads,
+            "atlas": self.atlas is not None,
+            "pack": self.pack is not None,
+        }
+
+    def clear(self):
+        with self.lock:
+            self.surfaces.clear()
+            self.hits = 0
+            self.misses = 0
+            self.file_loads = 0
+            self.atlas = None
+            self.atlas_checked = False
+            self.pack = None
+            self.pack_checked = False
+
+
+class TransformCache:
+    """Memoizes scaled/flipped variants of cached assets, keyed by (name, size, flip).
+
+    Bounded by total pixel bytes; the least recently used variant is evicted first.
+    """
+    def __init__(self, source, max_bytes=DERIVED_MAX_BYTES):
+        self.source = source
+        self.lock = source.lock
+        self.max_bytes = max_bytes
+        self.surfaces = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name, size=None, flip_x=False, flip_y=False):
+        key = (name, size, flip_x, flip_y)
+        with self.lock:
+            surface = self.surfaces.get(key)
+            if surface is not None:
+                self.hits += 1
+                self.surfaces.move_to_end(key)
+                return surface
+            self.misses += 1
+            pack = self.source.get_pack()
+            if pack is not None and size is not None and not (flip_x or flip_y) and pack.has(name, size):
+                surface = pack.surface(name, size)
+            else:
+                surface = self.source.image(name)
+            if size is not None and surface.get_size() != size:
+                surface = pygame.transform.scale(surface, size)
+            if flip_x or flip_y:
+                surface = pygame.transform.flip(surface, flip_x, flip_y)
+            self.surfaces[key] = surface
+            self.bytes += surface_bytes(surface)
+            while self.bytes > self.max_bytes and len(self.surfaces) > 1:
+                _, evicted = self.surfaces.popitem(last=False)
+                self.bytes -= surface_bytes(evicted)
+                self.evictions += 1
+            return surface
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "surfaces": len(self.surfaces),
+            "bytes": self.bytes,
+        }
+
+    def clear(self):
+        with self.lock:
+            self.surfaces.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+def surface_bytes(surface):
+    width, height = surface.get_size()
+    return width * height * surface.get_bytesize()
+
+
+cache = AssetCache()
+derived = TransformCache(cache)
+
+
+def image(name):
+    return cache.image(name)
+
+
+def frames(animation, indices=None):
+    return cache.frames(animation, indices)
+
+
+def scaled(name, size=None, flip_x=False, flip_y=False):
+    return derived.get(name, size, flip_x, flip_y)
+
+
+def scaled_frames(animation, size, indices=None):
+    """Like frames(), but every frame comes from the derived cache at the given size."""
+    if indices is None:
+        indices = range(len(cache.frames(animation)))
+    return [derived.get(f"{animation}/frame_{i}", size) for i in indices]
+
+
+def stats():
+    return {"assets": cache.stats(), "derived": derived.stats()}
@@ -0,0 +1,88 @@
+import pygame
+import json
+import os
+import sys
+
+# === Texture atlas ===
+# Offline step: packs every frame under the boss/player folders into one
+# sheet plus a JSON manifest mapping logical names ("blub/idle_left/frame_0")
+# to rects. At runtime the sheet is decoded once and frames are subsurfaces.
+IMAGES_DIR = "images"
+ATLAS_IMAGE = "atlas.png"
+ATLAS_MANIFEST = "atlas.json"
+SOURCES = ["bloop", "blub", "plu", "globulus"]
+SHEET_WIDTH = 512
+
+
+def collect(root=IMAGES_DIR):
+    """Returns (logical name, file path) for every PNG in the atlas sources."""
+    entries = []
+    for source in SOURCES:
+        for folder, _, files in os.walk(os.path.join(root, source)):
+            for file in sorted(files):
+                if not file.endswith(".png"):
+                    continue
+                full_path = os.path.join(folder, file)
+                name = os.path.relpath(full_path, root)[:-len(".png")].replace(os.sep, "/")
+                entries.append((name, full_path))
+    return sorted(entries)
+
+
+def pack(sizes, sheet_width=SHEET_WIDTH):
+    """Shelf packing, tallest first. Returns ({name: (x, y, w, h)}, sheet height)."""
+    rects = {}
+    x = y = shelf_height = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x + w > sheet_width:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        rects[name] = (x, y, w, h)
+        x += w
+        shelf_height = max(shelf_height, h)
+    return rects, y + shelf_height
+
+
+def build(root=IMAGES_DIR, sheet_width=SHEET_WIDTH):
+    images = {name: pygame.image.load(path) for name, path in collect(root)}
+    rects, height = pack({name: img.get_size() for name, img in images.items()}, sheet_width)
+
+    sheet = pygame.Surface((sheet_width, height), pygame.SRCALPHA)
+    for name, (x, y, _, _) in rects.items():
+        sheet.blit(images[name], (x, y))
+    pygame.image.save(sheet, os.path.join(root, ATLAS_IMAGE))
+
+    manifest = {"image": ATLAS_IMAGE, "frames": {name: list(rect) for name, rect in sorted(rects.items())}}
+    with open(os.path.join(root, ATLAS_MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=1)
+    return len(rects), (sheet_width, height)
+
+
+class Atlas:
+    """Runtime view of a built atlas: one decoded sheet, frames as subsurfaces."""
+    def __init__(self, sheet, frames):
+        self.sheet = sheet
+        self.frames = frames
+
+    def __contains__(self, name):
+        return name in self.frames
+
+    def image(self, name):
+        return self.sheet.subsurface(self.frames[name])
+
+
+def load(root=IMAGES_DIR):
+    """Returns the Atlas for root, or None when the build step has not been run."""
+    manifest_path = os.path.join(root, ATLAS_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    sheet = pygame.image.load(os.path.join(root, manifest["image"])).convert_alpha()
+    return Atlas(sheet, {name: pygame.Rect(rect) for name, rect in manifest["frames"].items()})
+
+
+if __name__ == "__main__":
+    root = sys.argv[1] if len(sys.argv) > 1 else IMAGES_DIR
+    count, size = build(root)
+    print(f"Packed {count} frames into {os.path.join(root, ATLAS_IMAGE)} ({size[0]}x{size[1]})")
@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import math
+import random
+import time
+
+# === Benchmark degli scenari ===
+# Runs scripted worst-case fights headless on a virtual clock and times
+# update and draw separately for every logic tick. Results are JSON so two
+# builds can be compared; --baseline fails the run when p99 frame time
+# regresses by more than --max-regression.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # stdout is JSON
+
+import pygame
+import gameloop
+import window
+import collision
+import render
+import simclock
+from simulate import ScriptedInput
+from bloop import Bloop
+from health_bar import HealthBar
+from sirBlub import SirBlub
+from chefPlu2 import ChefPlu
+from reglobulus import ReGlobulus
+
+WIDTH, HEIGHT = 800, 600
+TICKS = 60 * 60  # un minuto di gioco
+# Bloop keeps moving, jumping and firing so every hit path gets exercised
+BLOOP_SCRIPT = "RIGHT+2:20,RIGHT+1:5,SPACE:2,LEFT+2:20,LEFT+1:5,NONE:3"
+PERCENTILES = (50, 95, 99)
+
+
+class ForcedRandom(random.Random):
+    """random.Random whose choice() prefers the given abilities when offered."""
+    def __init__(self, seed, preferred):
+        super().__init__(seed)
+        self.preferred = preferred
+
+    def choice(self, seq):
+        wanted = [item for item in seq if item in self.preferred]
+        return super().choice(wanted or seq)
+
+
+def sir_blub_minions(clock, seed):
+    """Sir Blub only ever spawns, always the maximum of three minions."""
+    rng = ForcedRandom(seed, {"spawn"})
+    boss = SirBlub(400, HEIGHT - 64, clock, rng)
+    original_randint = rng.randint
+    rng.randint = lambda a, b: b if (a, b) == (1, 3) else original_randint(a, b)
+    return boss
+
+
+def minion_horde(clock, seed):
+    """A horde level: two thousand minions across the arena closing in on Bloop."""
+    boss = sir_blub_minions(clock, seed)
+    rng = random.Random(seed)
+    for _ in range(2000):
+        boss.minions.spawn(rng.randint(0, WIDTH - 32), HEIGHT - 32)
+    return boss
+
+
+def chef_plu_salsa_storm(clock, seed):
+    """Chef Plu only uses salsa_drop, dropping fifty salsas per cast."""
+    boss = ChefPlu(400, HEIGHT - 64, clock, ForcedRandom(seed, {"salsa_drop"}))
+    boss.salsa_count = 50
+    boss.salsa_drop_spawn_delay = 20
+    return boss
+
+
+def salsa_hard_mode(clock, seed):
+    """Hard mode: Chef Plu drops six hundred salsas per cast, one every tick."""
+    boss = ChefPlu(400, HEIGHT - 64, clock, ForcedRandom(seed, {"salsa_drop"}))
+    boss.salsa_count = 600
+    boss.salsa_drop_spawn_delay = 0
+    return boss
+
+
+def re_globulus_phase_2(clock, seed):
+    """Re Globulus starts in phase 2, summons Sir Blub, then keeps teleporting."""
+    boss = ReGlobulus(400, HEIGHT - 64, clock, ForcedRandom(seed, {"spawn", "teleport", "slime_combo"}))
+    boss.phase = 2
+    boss.max_hp = int(boss.initial_max_hp * 1.5)
+    boss.current_hp = boss.max_hp
+    boss.damage_multiplier = 1.5
+    boss.fire_line_duration = 6000  # fire lines overlap across teleports
+    return boss
+
+
+SCENARIOS = {
+    "sir_blub_minions": sir_blub_minions,
+    "minion_horde": minion_horde,
+    "chef_plu_salsa_storm": chef_plu_salsa_storm,
+    "salsa_hard_mode": salsa_hard_mode,
+    "re_globulus_phase_2": re_globulus_phase_2,
+}
+
+
+def summarize(samples):
+    """mean, percentiles and max of a list of seconds, reported in ms."""
+    ordered = sorted(samples)
+    n = len(ordered)
+    stats = {"mean": sum(ordered) / n * 1000}
+    for p in PERCENTILES:
+        rank = max(0, math.ceil(p / 100 * n) - 1)  # nearest rank
+        stats[f"p{p}"] = ordered[rank] * 1000
+    stats["max"] = ordered[-1] * 1000
+    return stats
+
+
+def keep_alive(bloop, boss):
+    """Scenarios measure sustained load, so nobody is allowed to die."""
+    bloop.current_hp = bloop.max_hp
+    boss.current_hp = boss.max_hp
+    sir_blub = getattr(boss, "spawned_sir_blub", None)
+    if sir_blub is not None:
+        sir_blub.current_hp = sir_blub.max_hp
+
+
+def run_scenario(name, ticks=TICKS, seed=0):
+    clock = simclock.VirtualClock()
+    boss = SCENARIOS[name](clock, seed)
+    bloop = Bloop(100, HEIGHT - 64, clock)
+    health_bar = HealthBar(bloop)
+    stage = collision.CollisionStage()
+    summon_stage = collision.CollisionStage()
+    queue = render.RenderQueue()
+    keys = ScriptedInput.parse(BLOOP_SCRIPT)
+    screen = pygame.Surface((WIDTH, HEIGHT))
+    update_times = []
+    draw_times = []
+    perf = time.perf_counter
+
+    for _ in range(ticks):
+        keep_alive(bloop, boss)
+        clock.advance(gameloop.STEP_MS)
+        start = perf()
+        bloop.update(keys.next())
+        boss.update(bloop)
+        stage.run(bloop, boss)
+        summon = boss.summoned()
+        if summon is not None:
+            summon.update(bloop)
+            summon_stage.run(bloop, summon)
+        middle = perf()
+        bloop.render(queue)
+        health_bar.render(queue)
+        boss.render(queue)
+        screen.fill(gameloop.BACKGROUND)
+        queue.flush(screen)
+        end = perf()
+        update_times.append(middle - start)
+        draw_times.append(end - middle)
+
+    return {
+        "ticks": ticks,
+        "update_ms": summarize(update_times),
+        "draw_ms": summarize(draw_times),
+        "frame_ms": summarize([u + d for u, d in zip(update_times, draw_times)]),
+    }
+
+
+def compare(results, baseline, max_regression):
+    """Returns the scenarios whose p99 frame time regressed past the threshold."""
+    failures = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["frame_ms"]["p99"]
+        after = result["frame_ms"]["p99"]
+        if after > before * (1 + max_regression):
+            failures.append(f"{name}: p99 frame {before:.3f} ms -> {after:.3f} ms")
+    return failures
+
+
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Scenario benchmarks with frame-time percentiles")
+    parser.add_argument("scenarios", nargs="*", help="any of %s (default: all)" % ", ".join(sorted(SCENARIOS)))
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON results here as well as to stdout")
+    parser.add_argument("--baseline", help="JSON from a previous run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="allowed p99 increase, 0.10 = 10%%")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error("unknown scenario: " + ", ".join(unknown))
+
+    window.open()
+    results = {name: run_scenario(name, args.ticks, args.seed) for name in (args.scenarios or sorted(SCENARIOS))}
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(results, json.load(f), args.max_regression)
+        for failure in failures:
+            print("REGRESSION " + failure, file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,16 +1,37 @@
 import pygame
-import os
+import assets
+import simclock
+import collision
+import render
+import animation
+from animation import LEFT, RIGHT
+from projectiles import ProjectilePool
 
 # === Configurazione iniziale ===
-pygame.init()
+# La finestra la apre window.open(), non l'import di questo modulo
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-clock = pygame.time.Clock()
+# Stati come interi: indicizzano le tabelle di frame e di ritardi
+IDLE, RUN, JUMP, DIE, MELEE, LONG = range(6)
+ANIMATED = ("idle", "run", "jump", "die")  # nomi degli stati IDLE..DIE negli asset
+NO_FRAMES = ()  # stati senza animazione propria (melee, long)
 
 
 # === Classe Bloop ===
 class Bloop:
-    def __init__(self, x, y):
+    # Every attribute is declared here: instances carry no __dict__, which
+    # makes them smaller and the attribute reads in update() cheaper. A new
+    # attribute set in __init__ has to be added to the list as well.
+    __slots__ = (
+        "clock", "x", "y", "ground_y", "vel_x", "vel_y", "gravity", "jump_strength", "direction",
+        "state", "previous_state", "frame_index", "frame_timer", "frame_delay", "frame_delays",
+        "jump_count", "max_jumps", "jump_pressed", "animations", "frame_table", "rect",
+        "melee_rect", "projectiles", "ranged_cooldown", "last_ranged_attack", "melee_cooldown",
+        "melee_duration", "last_melee_attack", "melee_active", "melee_start_time", "max_hp",
+        "current_hp", "dead", "die_sprite", "die_y", "die_speed",
+    )
+
+    def __init__(self, x, y, clock=None):
+        self.clock = clock if clock is not None else simclock.real  # timers in ms
         self.x = x
         self.y = y
         self.ground_y = y
@@ -18,27 +39,33 @@ class Bloop:
         self.vel_y = 0
         self.gravity = 1
         self.jump_strength = -20
-        self.direction = "right"
-        self.state = "idle"
-        self.previous_state = "idle"
+        self.direction = RIGHT
+        self.state = IDLE
+        self.previous_state = IDLE
         self.frame_index = 0
         self.frame_timer = 0
         self.frame_delay = 13
-        self.frame_delays = {
-            "idle": 10,
-            "run": 8,
-            "jump": 8
-        }
+        self.frame_delays = (10, 8, 8, 10, 10, 10)  # per stato, IDLE..LONG
         self.jump_count = 0
         self.max_jumps = 2
         self.jump_pressed = False
         self.animations = self.load_animations()
-        self.projectiles = []
+        # direction -> state -> frames, so update() and render() index
+        # tuples instead of building f"{state}_{direction}" keys every tick
+        self.frame_table = tuple(
+            tuple(self.animations[f"{state}_{direction}"] for state in ANIMATED) + (NO_FRAMES, NO_FRAMES)
+            for direction in animation.DIRECTIONS)
+        # Hurtbox and melee hitbox, moved in place by get_rect()/get_melee_rect()
+        self.rect = pygame.Rect(x, y, 64, 64)
+        self.melee_rect = pygame.Rect(x, y, 64, 64)
+        self.projectiles = ProjectilePool(arena_width=WIDTH)
         self.ranged_cooldown = 1500  # in millisecondi
-        self.last_ranged_attack = 0
+        # Pronti dal primo tick, come quando il timer era get_ticks() e il
+        # menu aveva già fatto passare il tempo
+        self.last_ranged_attack = -self.ranged_cooldown
         self.melee_cooldown = 750  # ms
         self.melee_duration = 250  # ms
-        self.last_melee_attack = 0
+        self.last_melee_attack = -self.melee_cooldown
         self.melee_active = False
         self.melee_start_time = 0
         self.max_hp = 100
@@ -54,26 +81,19 @@ class Bloop:
         animations = {}
         target_size = (64, 64)  # nuova dimensione
         # === Attacchi ===
-        attack_path = "images/bloop/attacks"
-        melee_img = pygame.image.load(os.path.join(attack_path, "melee.png")).convert_alpha()
-        melee_img = pygame.transform.scale(melee_img, (64, 64))
+        melee_img = assets.scaled("bloop/attacks/melee", (64, 64))
         animations["melee"] = [melee_img]
 
-        long_img = pygame.image.load(os.path.join(attack_path, "long.png")).convert_alpha()
+        long_img = assets.scaled("bloop/attacks/long")
         animations["long"] = [long_img]  # già 64x64, non serve ridimensionare
 
         for state in ["idle", "run", "jump"]:
-            for direction in ["left", "right"]:
-                path = f"images/bloop/{state}_{direction}"
-                frames = []
-                for i in range(10):  # supporta fino a 10 frame
-                    file = f"frame_{i}.png"
-                    full_path = os.path.join(path, file)
-                    if os.path.exists(full_path):
-                        image = pygame.image.load(full_path).convert_alpha()
-                        image = pygame.transform.scale(image, target_size)
-                        frames.append(image)
-                animations[f"{state}_{direction}"] = frames
+            for direction in animation.DIRECTIONS:
+                animations[f"{state}_{direction}"] = assets.scaled_frames(f"bloop/{state}_{direction}", target_size)
+
+        # === Morte (frame_0 corpo, frame_1 sprite che sale) ===
+        for direction in animation.DIRECTIONS:
+            animations[f"die_{direction}"] = assets.scaled_frames(f"bloop/die_{direction}", target_size)
         return animations
 
     def update(self, keys):
@@ -83,16 +103,16 @@ class Bloop:
         self.vel_x = 0
         if keys[pygame.K_LEFT] and not self.dead:
             self.vel_x = -5
-            self.direction = "left"
+            self.direction = LEFT
         elif keys[pygame.K_RIGHT] and not self.dead:
             self.vel_x = 5
-            self.direction = "right"
+            self.direction = RIGHT
 
         # === Salto (solo se a terra) ===
         if keys[pygame.K_SPACE]:
             if not self.jump_pressed and self.jump_count < self.max_jumps and not self.dead:
                 self.vel_y = self.jump_strength
-                self.state = "jump"
+                self.state = JUMP
                 self.frame_index = 0
                 self.jump_count += 1
                 self.jump_pressed = True
@@ -106,9 +126,9 @@ class Bloop:
 
         # === Gestione durata attacco melee ===
         if self.melee_active:
-            if pygame.time.get_ticks() - self.melee_start_time >= self.melee_duration:
+            if self.clock.now() - self.melee_start_time >= self.melee_duration:
                 self.melee_active = False
-                self.state = "idle"
+                self.state = IDLE
 
         # === Fisica verticale ===
         self.vel_y += self.gravity
@@ -123,15 +143,15 @@ class Bloop:
             self.jump_count = 0
             self.y = self.ground_y
             self.vel_y = 0
-            if self.state == "jump":
-                self.state = "idle"
+            if self.state == JUMP:
+                self.state = IDLE
 
         # === Gestione stato ===
-        if self.state != "jump":  # salto ha priorità
+        if self.state != JUMP:  # salto ha priorità
             if self.vel_x != 0:
-                self.state = "run"
+                self.state = RUN
             else:
-                self.state = "idle"
+                self.state = IDLE
 
         # === Reset frame se cambia stato ===
         if self.state != self.previous_state:
@@ -140,26 +160,23 @@ class Bloop:
 
         # === Animazione ===
         self.frame_timer += 1
-        current_delay = self.frame_delays.get(self.state, 10)
+        current_delay = self.frame_delays[self.state]
         if self.frame_timer >= current_delay:
             self.frame_timer = 0
-            frames = self.animations.get(f"{self.state}_{self.direction}", [])
+            frames = self.frame_table[self.direction][self.state]
             if frames:
                 self.frame_index = (self.frame_index + 1) % len(frames)
-        for p in self.projectiles:
-            p["x"] += p["vel"]
+        self.projectiles.update()
         if self.current_hp <= 0 and not self.dead:
             self.dead = True
-            self.state = "die"
+            self.state = DIE
             self.frame_index = 0
             self.frame_timer = 0
             self.vel_x = 0
             self.vel_y = 0
-            die_path = f"images/bloop/die_{self.direction}"
-            frame_1_path = os.path.join(die_path, "frame_1.png")
-            if os.path.exists(frame_1_path):
-                self.die_sprite = pygame.image.load(frame_1_path).convert_alpha()
-                self.die_sprite = pygame.transform.scale(self.die_sprite, (64, 64))
+            die_frames = self.frame_table[self.direction][DIE]
+            if len(die_frames) > 1:
+                self.die_sprite = die_frames[1]
             self.die_y = self.y
 
         if self.dead:
@@ -171,61 +188,73 @@ class Bloop:
                 raise Exception("bloop is defeated!")
 
     def melee_attack(self):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.now()
         if current_time - self.last_melee_attack >= self.melee_cooldown:
-            self.state = "melee"
+            self.state = MELEE
             self.frame_index = 0
             self.melee_active = True
             self.melee_start_time = current_time
             self.last_melee_attack = current_time
 
     def ranged_attack(self):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.now()
         if current_time - self.last_ranged_attack >= self.ranged_cooldown:
-            self.state = "long"
+            self.state = LONG
             self.frame_index = 0
-            direction = 1 if self.direction == "right" else -1
-            projectile = {
-                "x": self.x + 32,
-                "y": self.y + 32,
-                "vel": 10 * direction,
-                "damage": 8,
-                "image": self.animations["long"][0],
-                "active": True
-            }
-            self.projectiles.append(projectile)
+            direction = 1 if self.direction == RIGHT else -1
+            self.projectiles.spawn(self.x + 32, self.y + 32, 10 * direction, 8)
             self.last_ranged_attack = current_time
 
     def take_damage(self, amount):
         self.current_hp = max(0, self.current_hp - amount)
 
+    # === Collisioni (risolte da collision.CollisionStage) ===
+    def register_colliders(self, stage):
+        stage.add_hurtbox(self.get_rect(), self, collision.PLAYER)
+        if self.melee_active:
+            stage.add_hitbox(self.get_melee_rect(), self, "melee", collision.PLAYER)
+        p = self.projectiles
+        for i in p.live:
+            stage.add_hitbox(p.rect(i), self, "projectile", collision.PLAYER, i)
+
+    def on_contact(self, kind, data, target):
+        if kind == "melee":
+            # Un solo colpo finché il pugno resta a contatto
+            if not target.melee_hit_registered:
+                target.take_damage(4)
+                target.melee_hit_registered = True
+        elif kind == "projectile":
+            # A shot can overlap two targets; only the first one takes it
+            if self.projectiles.active[data]:
+                target.take_damage(self.projectiles.damage[data])
+                self.projectiles.retire(data)
+
     def get_melee_rect(self):
-        offset = 64 if self.direction == "right" else -64
-        return pygame.Rect(self.x + offset, self.y, 64, 64)
+        offset = 64 if self.direction == RIGHT else -64
+        self.melee_rect.update(self.x + offset, self.y, 64, 64)
+        return self.melee_rect
 
     def get_projectile_rects(self):
-        return [pygame.Rect(p["x"], p["y"], 64, 64) for p in self.projectiles]
+        p = self.projectiles
+        return [p.rect(i) for i in p.live]
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, 64, 64)
-    def draw(self, surface):
-        frames = self.animations.get(f"{self.state}_{self.direction}", [])
-        for p in self.projectiles:
-            if p["active"]:
-                surface.blit(p["image"], (p["x"], p["y"]))
+        self.rect.update(self.x, self.y, 64, 64)
+        return self.rect
+    def render(self, queue):
+        frames = self.frame_table[self.direction][self.state]
+        self.projectiles.render(queue, render.PROJECTILES, self.animations["long"][0])
         if self.melee_active:
-            offset = 64 if self.direction == "right" else -64
-            surface.blit(self.animations["melee"][0], (self.x + offset, self.y))
+            offset = 64 if self.direction == RIGHT else -64
+            queue.add(render.EFFECTS, self.animations["melee"][0], (self.x + offset, self.y))
         if self.dead:
-            die_frame_0_path = f"images/bloop/die_{self.direction}/frame_0.png"
-            if os.path.exists(die_frame_0_path):
-                die_img = pygame.image.load(die_frame_0_path).convert_alpha()
-                die_img = pygame.transform.scale(die_img, (64, 64))
-                surface.blit(die_img, (self.x, self.y))
+            die_frames = self.frame_table[self.direction][DIE]
+            if die_frames:
+                queue.add(render.CHARACTERS, die_frames[0], (self.x, self.y))
             if self.die_sprite:
-                surface.blit(self.die_sprite, (self.x, self.die_y))
+                queue.add(render.CHARACTERS, self.die_sprite, (self.x, self.die_y))
         elif frames:
             index = self.frame_index % len(frames)
-            surface.blit(frames[index], (self.x, self.y))
+            queue.add(render.CHARACTERS, frames[index], (self.x, self.y))
         
 
         
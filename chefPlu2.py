@@ -1,24 +1,55 @@
 import pygame
 import random
-import os
+import assets
+import simclock
+import collision
+import render
+import hud
+import animation
+from animation import LEFT, RIGHT
+from hazards import HazardField
 # MiniBlub is no longer needed as minions are replaced by salsa_drop
 # from miniBlub import MiniBlub
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600 # Added for consistency, especially for salsa drop
+ABILITIES = ("melee", "fiammata", "salsa_drop", "sprint")
+# Animazioni per direzione e stato, come id interi calcolati una volta sola
+STATES = ("idle", "sprint", "fiammata_charge", "fiammata_active")
+IDLE, SPRINT, FIAMMATA_CHARGE, FIAMMATA_ACTIVE = range(len(STATES))
+ANIMATIONS = animation.table(len(STATES))  # direction -> state -> animation id
+SALSA_DROP_CHARGE, SALSA_DROP_ACTIVE = range(2 * len(STATES), 2 * len(STATES) + 2)  # undirected
+ANIMATION_NAMES = animation.names(STATES, ("salsa_drop_charge", "salsa_drop_active"))
 
 class ChefPlu:
-    def __init__(self, x, y):
+    __slots__ = (
+        "clock", "rng", "x", "y", "width", "height", "max_hp", "hp_bar", "current_hp",
+        "attack_cooldown", "last_attack_time", "attacking", "frame_index", "frame_timer",
+        "frame_speed", "melee_hit_registered", "direction", "current_animation",
+        "rect", "ability_cooldown", "last_ability_time", "current_ability", "fiammata_charging",
+        "fiammata_active", "fiammata_charge_start_time", "fiammata_start_time",
+        "fiammata_charge_time", "fiammata_duration", "fiammata_damage", "laser_rect", "laser_fired",
+        "salsa_drop_charging", "salsa_drop_active", "salsa_drop_charge_start_time",
+        "salsa_drop_charge_time", "salsa_drop_spawn_delay", "last_salsa_spawn_time",
+        "salsa_gravity", "salsa_projectiles", "salsa_initial_speed", "salsa_damage", "salsa_count",
+        "salsa_spawned_count", "sprint_active", "sprint_start_time", "sprint_duration",
+        "sprint_speed", "sprint_damage", "animations", "frames", "image",
+    )
+
+    def __init__(self, x, y, clock=None, rng=None):
+        self.clock = clock if clock is not None else simclock.real  # timers in ms
+        self.rng = rng if rng is not None else random  # random.Random per fight for replays
         self.x = x
         self.y = y
         self.width = 64
         self.height = 64
 
         self.max_hp = 300
+        self.hp_bar = hud.Bar((self.width, 5), (0, 100, 255))
         self.current_hp = 300
 
         self.attack_cooldown = 1000 # General cooldown for melee attacks
-        self.last_attack_time = 0
+        self.last_attack_time = -self.attack_cooldown # Ready on the first tick of the fight
         self.attacking = False # Flag for brief melee attack animation feedback
 
         self.frame_index = 0
@@ -26,21 +57,24 @@ class ChefPlu:
         self.frame_speed = 10
         self.melee_hit_registered = False # To prevent multiple hits from one melee attack
 
-        self.direction = "right"
-        self.current_animation = "idle_right"
+        self.direction = RIGHT
+        self.current_animation = ANIMATIONS[RIGHT][IDLE]
+        self.rect = pygame.Rect(x, y, self.width, self.height) # Updated in place by get_rect()
 
         self.ability_cooldown = 2000 # Cooldown before Chef Plu can choose a new ability
-        self.last_ability_time = 0
+        self.last_ability_time = -self.ability_cooldown
         self.current_ability = None # Stores the currently active ability (e.g., "fiammata", "salsa_drop", "sprint", "melee")
 
         # --- Fiammata Ability Variables ---
         self.fiammata_charging = False
         self.fiammata_active = False
         self.fiammata_charge_start_time = 0
+        self.fiammata_start_time = 0 # When the laser fired
         self.fiammata_charge_time = 700  # Milliseconds to charge before laser fires
         self.fiammata_duration = 700 # Milliseconds the laser stays active
         self.fiammata_damage = 15
         self.laser_rect = pygame.Rect(0, 0, 0, 0) # Placeholder for the laser's collision rectangle
+        self.laser_fired = False # The laser only hurts on the tick it fires
 
         # --- Salsa Drop Ability Variables ---
         self.salsa_drop_charging = False
@@ -49,8 +83,9 @@ class ChefPlu:
         self.salsa_drop_charge_time = 1000 # Milliseconds to charge before salsa drops
         self.salsa_drop_spawn_delay = 200 # Delay between individual salsa drops
         self.last_salsa_spawn_time = 0
-        self.salsa_projectiles = [] # List to hold active salsa projectiles
         self.salsa_gravity = 0.5
+        # Salsa drops in the air, 32x32, spent once they fall off the screen
+        self.salsa_projectiles = HazardField((32, 32), self.salsa_gravity, SCREEN_HEIGHT)
         self.salsa_initial_speed = 3
         self.salsa_damage = 5
         self.salsa_count = 4 # Number of salsa projectiles to drop
@@ -65,68 +100,50 @@ class ChefPlu:
 
         # Load all animations
         self.animations = self.load_animations()
-        self.image = self.animations[self.current_animation][self.frame_index]
+        self.frames = animation.frames(self.animations, ANIMATION_NAMES)
+        self.image = self.frames[self.current_animation][self.frame_index]
 
     def load_animations(self):
         animations = {}
         target_size = (64, 64)
 
         # Idle (2 frames)
-        for direction in ["left", "right"]:
-            path = f"images/plu/idle_{direction}"
-            frames = []
-            for i in range(2):
-                file = f"frame_{i}.png"
-                full_path = pygame.image.load(os.path.join(path, file)).convert_alpha()
-                frames.append(pygame.transform.scale(full_path, target_size))
-            animations[f"idle_{direction}"] = frames
+        for direction in animation.DIRECTIONS:
+            animations[f"idle_{direction}"] = assets.scaled_frames(f"plu/idle_{direction}", target_size, range(2))
         
         # Sprint (2 frames)
-        for direction in ["left", "right"]:
-            path = f"images/plu/sprint_{direction}"
-            frames = []
-            for i in range(2):
-                file = f"frame_{i}.png"
-                full_path = pygame.image.load(os.path.join(path, file)).convert_alpha()
-                frames.append(pygame.transform.scale(full_path, target_size))
-            animations[f"sprint_{direction}"] = frames
+        for direction in animation.DIRECTIONS:
+            animations[f"sprint_{direction}"] = assets.scaled_frames(f"plu/sprint_{direction}", target_size, range(2))
 
         # Fiammata (charge and active, 1 frame each)
-        for direction in ["left", "right"]:
-            path = f"images/plu/fiammata_{direction}"
-            charge_img = pygame.image.load(os.path.join(path, "frame_1.png")).convert_alpha()
-            charge_img = pygame.transform.scale(charge_img, target_size)
-            active_img = pygame.image.load(os.path.join(path, "frame_2.png")).convert_alpha()
-            active_img = pygame.transform.scale(active_img, target_size)
+        for direction in animation.DIRECTIONS:
+            charge_img = assets.scaled(f"plu/fiammata_{direction}/frame_1", target_size)
+            active_img = assets.scaled(f"plu/fiammata_{direction}/frame_2", target_size)
             animations[f"fiammata_charge_{direction}"] = [charge_img]
             animations[f"fiammata_active_{direction}"] = [active_img]
 
         # Salsa Drop (charge and active, 1 frame each)
-        path = "images/plu/salsa_drop"
-        salsa_charge_img = pygame.image.load(os.path.join(path, "frame_1.png")).convert_alpha()
-        salsa_charge_img = pygame.transform.scale(salsa_charge_img, target_size)
-        salsa_active_img = pygame.image.load(os.path.join(path, "frame_2.png")).convert_alpha()
-        salsa_active_img = pygame.transform.scale(salsa_active_img, target_size)
+        salsa_charge_img = assets.scaled("plu/salsa_drop/frame_1", target_size)
+        salsa_active_img = assets.scaled("plu/salsa_drop/frame_2", target_size)
         animations["salsa_drop_charge"] = [salsa_charge_img]
         animations["salsa_drop_active"] = [salsa_active_img]
 
         # Salsa Projectile (single image)
-        salsa_proj_img = pygame.image.load("images/plu/salsa.png").convert_alpha()
-        salsa_proj_img = pygame.transform.scale(salsa_proj_img, (32, 32)) # Smaller size for projectiles
+        salsa_proj_img = assets.scaled("plu/salsa", (32, 32)) # Smaller size for projectiles
         animations["salsa_projectile"] = [salsa_proj_img]
 
         return animations
 
     def update(self, bloop):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.now()
         # Determine direction based on Bloop's position
-        self.direction = "left" if bloop.x < self.x else "right"
+        self.direction = LEFT if bloop.x < self.x else RIGHT
 
         # --- Handle Currently Active Abilities ---
         if self.fiammata_charging:
             # Set animation for charging
-            self.current_animation = f"fiammata_charge_{self.direction}"
-            self.image = self.animations[self.current_animation][0]
+            self.current_animation = ANIMATIONS[self.direction][FIAMMATA_CHARGE]
+            self.image = self.frames[self.current_animation][0]
             if current_time - self.fiammata_charge_start_time >= self.fiammata_charge_time:
                 self.fiammata_charging = False
                 self.fiammata_active = True
@@ -134,33 +151,30 @@ class ChefPlu:
 
                 # Define laser collision rectangle based on direction
                 laser_height = 20 # Thickness of the laser
-                if self.direction == "right":
+                if self.direction == RIGHT:
                     # Laser extends from Plu's right side to the end of the screen
-                    self.laser_rect = pygame.Rect(self.x + self.width, self.y + self.height // 2 - laser_height // 2,
-                                                  SCREEN_WIDTH - (self.x + self.width), laser_height)
+                    self.laser_rect.update(self.x + self.width, self.y + self.height // 2 - laser_height // 2,
+                                           SCREEN_WIDTH - (self.x + self.width), laser_height)
                 else: # left
                     # Laser extends from the left edge of the screen to Plu's left side
-                    self.laser_rect = pygame.Rect(0, self.y + self.height // 2 - laser_height // 2,
-                                                  self.x, laser_height)
-                
-                # Check for collision with Bloop immediately when laser activates
-                if self.laser_rect.colliderect(bloop.get_rect()):
-                    bloop.take_damage(self.fiammata_damage)
+                    self.laser_rect.update(0, self.y + self.height // 2 - laser_height // 2,
+                                           self.x, laser_height)
+                self.laser_fired = True # Bloop is hit (once) by the collision stage
 
         elif self.fiammata_active:
             # Set animation for active laser
-            self.current_animation = f"fiammata_active_{self.direction}"
-            self.image = self.animations[self.current_animation][0]
+            self.current_animation = ANIMATIONS[self.direction][FIAMMATA_ACTIVE]
+            self.image = self.frames[self.current_animation][0]
             if current_time - self.fiammata_start_time >= self.fiammata_duration:
                 # End fiammata ability
                 self.fiammata_active = False
                 self.current_ability = None
-                self.laser_rect = pygame.Rect(0, 0, 0, 0) # Reset laser rect
+                self.laser_rect.update(0, 0, 0, 0) # Reset laser rect
 
         elif self.salsa_drop_charging:
             # Set animation for charging salsa drop
-            self.current_animation = "salsa_drop_charge"
-            self.image = self.animations[self.current_animation][0]
+            self.current_animation = SALSA_DROP_CHARGE
+            self.image = self.frames[self.current_animation][0]
             if current_time - self.salsa_drop_charge_start_time >= self.salsa_drop_charge_time:
                 self.salsa_drop_charging = False
                 self.salsa_drop_active = True
@@ -169,40 +183,24 @@ class ChefPlu:
 
         elif self.salsa_drop_active:
             # Set animation for active salsa drop
-            self.current_animation = "salsa_drop_active"
-            self.image = self.animations[self.current_animation][0]
+            self.current_animation = SALSA_DROP_ACTIVE
+            self.image = self.frames[self.current_animation][0]
 
             # Continuously spawn salsa during active phase until salsa_count is reached
             if self.salsa_spawned_count < self.salsa_count and \
                current_time - self.last_salsa_spawn_time >= self.salsa_drop_spawn_delay:
-                salsa_x = random.randint(0, SCREEN_WIDTH - 32) # Salsa is 32x32
-                self.salsa_projectiles.append({
-                    "x": salsa_x,
-                    "y": -32, # Start above screen
-                    "vel_y": self.salsa_initial_speed,
-                    "image": self.animations["salsa_projectile"][0],
-                    "active": True
-                })
+                salsa_x = self.rng.randint(0, SCREEN_WIDTH - 32) # Salsa is 32x32
+                self.salsa_projectiles.spawn(salsa_x, -32, self.salsa_initial_speed, self.salsa_damage) # Start above screen
                 self.last_salsa_spawn_time = current_time
                 self.salsa_spawned_count += 1 # Increment counter for spawned salsa
             
-            # Update and check collision for each salsa projectile
-            for salsa in self.salsa_projectiles:
-                if salsa["active"]:
-                    salsa["vel_y"] += self.salsa_gravity
-                    salsa["y"] += salsa["vel_y"]
-                    # Create rect for collision check
-                    salsa_rect = pygame.Rect(salsa["x"], salsa["y"], 32, 32)
-                    if bloop.get_rect().colliderect(salsa_rect):
-                        bloop.take_damage(self.salsa_damage)
-                        salsa["active"] = False # Deactivate salsa after hitting
-
-                    # Remove salsa if it goes off screen
-                    if salsa["y"] > SCREEN_HEIGHT:
-                        salsa["active"] = False
-            
-            # Filter out inactive salsa projectiles
-            self.salsa_projectiles = [s for s in self.salsa_projectiles if s["active"]]
+            # Fall all salsa at once; the ones off screen are retired
+            salsa = self.salsa_projectiles
+            salsa.update()
+            # Hits on Bloop land right away, so the end check below sees them
+            for slot in salsa.hits(bloop.get_rect()):
+                bloop.take_damage(int(salsa.damage[slot]))
+                salsa.retire(slot) # Deactivate salsa after hitting
 
             # NEW: End salsa_drop ability if all salsa have been spawned AND all are inactive
             if self.salsa_spawned_count >= self.salsa_count and not self.salsa_projectiles:
@@ -211,11 +209,11 @@ class ChefPlu:
 
         elif self.sprint_active:
             # Use sprint animation
-            self.current_animation = f"sprint_{self.direction}"
+            self.current_animation = ANIMATIONS[self.direction][SPRINT]
             self.update_animation() # Animate Chef Plu walking
 
             # Move Chef Plu towards Bloop
-            if self.direction == "right":
+            if self.direction == RIGHT:
                 self.x += self.sprint_speed
             else:
                 self.x -= self.sprint_speed
@@ -239,7 +237,7 @@ class ChefPlu:
         # This occurs only if current_ability is set to "melee"
         elif self.current_ability == "melee":
             # Melee animation uses idle frames
-            self.current_animation = f"idle_{self.direction}"
+            self.current_animation = ANIMATIONS[self.direction][IDLE]
             self.update_animation() # Continue idle animation while in melee state
 
             if self.get_rect().colliderect(bloop.get_rect()) and current_time - self.last_attack_time >= self.attack_cooldown:
@@ -261,7 +259,7 @@ class ChefPlu:
             if current_time - self.last_ability_time >= self.ability_cooldown:
                 self.last_ability_time = current_time
                 # Randomly choose a new ability
-                self.current_ability = random.choice(["melee", "fiammata", "salsa_drop", "sprint"])
+                self.current_ability = self.rng.choice(ABILITIES)
                 
                 # Initialize variables for the chosen ability
                 if self.current_ability == "fiammata":
@@ -270,7 +268,7 @@ class ChefPlu:
                 elif self.current_ability == "salsa_drop":
                     self.salsa_drop_charging = True
                     self.salsa_drop_charge_start_time = current_time
-                    self.salsa_projectiles = []
+                    self.salsa_projectiles.clear()
                     self.salsa_spawned_count = 0 # NEW: Reset count when ability starts
                 elif self.current_ability == "sprint":
                     self.sprint_active = True
@@ -283,67 +281,65 @@ class ChefPlu:
             if not self.fiammata_charging and not self.fiammata_active and \
                not self.salsa_drop_charging and not self.salsa_drop_active and \
                not self.sprint_active and not (self.current_ability == "melee" and self.attacking):
-                self.current_animation = f"idle_{self.direction}"
+                self.current_animation = ANIMATIONS[self.direction][IDLE]
                 self.update_animation() # Only update idle if truly idling/moving without special ability
 
-        # --- Handle Damage from Bloop ---
-        # This section is independent of Chef Plu's abilities
-        if bloop.melee_active and self.get_rect().colliderect(bloop.get_melee_rect()):
-            if not self.melee_hit_registered:
-                self.take_damage(4) # Damage from Bloop's melee
-                self.melee_hit_registered = True
-        else:
-            self.melee_hit_registered = False
-
-        for p in bloop.projectiles:
-            if p["active"]:
-                proj_rect = pygame.Rect(p["x"], p["y"], 64, 64)
-                if self.get_rect().colliderect(proj_rect):
-                    self.take_damage(p["damage"])
-                    p["active"] = False
+        # MiniBlubs (minions) and their update loop have been removed.
+        # If you later decide to re-introduce a similar concept, you'd add a new list
+        # and update loop here.
+
+    # --- Collisions ---
+    # Bloop's melee and projectiles hit the hurtbox registered here; the
+    # laser reaches Bloop through on_contact()
+    def register_colliders(self, stage):
+        stage.add_hurtbox(self.get_rect(), self, collision.ENEMY)
+        if self.laser_fired:
+            self.laser_fired = False
+            stage.add_hitbox(self.laser_rect, self, "laser", collision.ENEMY)
+
+    def on_contact(self, kind, data, bloop):
+        if kind == "laser":
+            bloop.take_damage(self.fiammata_damage)
 
+    def after_contacts(self, bloop):
         # --- Check for Defeat ---
+        # After the collision pass, so Bloop's hits this tick count
         if self.current_hp <= 0:
             raise Exception("Chef Plu is defeated!")
 
-        # MiniBlubs (minions) and their update loop have been removed.
-        # If you later decide to re-introduce a similar concept, you'd add a new list
-        # and update loop here.
+    def summoned(self):
+        return None
 
     def update_animation(self):
         # Generic animation update logic for states like idle and sprint
         self.frame_timer += 1
         if self.frame_timer >= self.frame_speed:
             self.frame_timer = 0
-            frames = self.animations[self.current_animation]
+            frames = self.frames[self.current_animation]
             self.frame_index = (self.frame_index + 1) % len(frames)
-            self.image = pygame.transform.scale(frames[self.frame_index], (self.width, self.height))
+            self.image = frames[self.frame_index] # frames are already width x height
 
     def take_damage(self, amount):
         self.current_hp = max(0, self.current_hp - amount)
 
     def get_rect(self):
         # Returns the current bounding box for Chef Plu
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
 
-    def draw(self, screen):
+    def render(self, queue):
         # Draw Chef Plu's current image
-        screen.blit(self.image, (self.x, self.y))
+        queue.add(render.CHARACTERS, self.image, (self.x, self.y))
         
         # Draw Fiammata Laser if active
         if self.fiammata_active:
-            # Draw a red rectangle for the laser visual
-            pygame.draw.rect(screen, (255, 0, 0), self.laser_rect)
+            # A red rectangle for the laser visual
+            render.fill_rect(queue, render.EFFECTS, self.laser_rect, (255, 0, 0))
 
         # Draw Salsa Projectiles
-        for salsa in self.salsa_projectiles:
-            if salsa["active"]:
-                screen.blit(salsa["image"], (salsa["x"], salsa["y"]))
+        self.salsa_projectiles.render(queue, render.PROJECTILES, self.animations["salsa_projectile"][0])
         
-        # Draw Health Bar
+        # Draw Health Bar, redrawn only when it changes by a pixel
         hp_ratio = self.current_hp / self.max_hp
-        # Background of health bar
-        pygame.draw.rect(screen, (50, 50, 50), (self.x, self.y - 10, self.width, 5))
-        # Foreground (current HP) of health bar
-        pygame.draw.rect(screen, (0, 100, 255), (self.x, self.y - 10, self.width * hp_ratio, 5))
+        self.hp_bar.render(queue, (self.x, self.y - 10), hp_ratio)
 
@@ -0,0 +1,244 @@
+# === Stadio di collisione centrale ===
+# Once per logic tick, after every entity has moved, each entity registers
+# its hurtboxes (what can be hit) and hitboxes (what deals damage) through
+# register_colliders(stage). Every hitbox is tested against the hurtboxes of
+# the other team with Rect.collidelistall, so the tests run in C and Python
+# only pays for actual contacts. Once a team is crowded enough its hurtboxes
+# go into a uniform grid and each hitbox only tests the cells it overlaps.
+# Swarms kept in arrays (miniBlub.MiniBlubSwarm) register as one hitfield
+# and/or hurtfield and test themselves against a rect with a few vector ops:
+# hits(rect) for a hitfield against each hurtbox, hit_pairs(rects) for all of
+# the other team's hitboxes against a hurtfield.
+# Each contact is delivered to the hitbox owner as
+# owner.on_contact(kind, data, target), hitfields first and then hitboxes,
+# each in registration order, so fights stay deterministic for replays. A
+# hitfield gets one call per target, with data the list of its slots touching
+# it; a hurtfield slot is handed over as the target field.member(slot).
+# Contacts a boss's AI reacts to within the same tick (its body reaching
+# Bloop, the salsa drops and slime balls whose last hit ends an ability) are
+# not routed through the stage: they are still tested in its update(), which
+# would otherwise see them a tick late. After the pass the boss gets
+# after_contacts(bloop), so Bloop's hits decide a defeat on the tick they
+# land. A boss the boss summoned (boss.summoned(), ReGlobulus's Sir Blub) is
+# a step of the level loop after that, with a CollisionStage of its own.
+# The stage keeps its lists and dicts from tick to tick and only clears them,
+# so a steady-state tick does not allocate its bookkeeping again.
+CELL_SIZE = 128
+PLAYER = "player"
+ENEMY = "enemy"
+TEAMS = (PLAYER, ENEMY)  # loops go over this rather than a dict view, one object less per loop
+# Rect tests per team below which one collidelistall scan (in C) beats
+# building and querying the grid in Python; measured break-even on the
+# 800x600 arena is around 60k (about 250 hitboxes x 250 hurtboxes)
+MAX_SCAN_TESTS = 60000
+# Contacts that hit once and then latch until the boxes separate:
+# kind -> flag on the target that on_contact sets and the stage clears
+LATCHED = {"melee": "melee_hit_registered"}
+LATCHED_FLAGS = tuple(LATCHED.items())
+
+
+class SpatialHash:
+    """Uniform grid: each cell keeps the rects overlapping it and their indices."""
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> ([rect, ...], [index, ...])
+
+    def clear(self):
+        self.cells.clear()
+
+    def insert(self, rect, index):
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        size = self.cell_size
+        cells = self.cells
+        rows = range(rect.top // size, (rect.bottom - 1) // size + 1)
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in rows:
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = ([rect], [index])
+                else:
+                    bucket[0].append(rect)
+                    bucket[1].append(index)
+
+    def query(self, rect):
+        """Indices of the boxes colliding with rect, in insertion order, and
+        how many boxes were tested. The rect tests run in C (collidelistall)."""
+        if rect.width <= 0 or rect.height <= 0:
+            return [], 0
+        size = self.cell_size
+        cells = self.cells
+        rows = range(rect.top // size, (rect.bottom - 1) // size + 1)
+        found = None
+        tests = 0
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in rows:
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    rects, indices = bucket
+                    tests += len(rects)
+                    for i in rect.collidelistall(rects):
+                        if found is None:
+                            found = set()
+                        found.add(indices[i])
+        return (sorted(found) if found else []), tests
+
+
+class CollisionStage:
+    def __init__(self, cell_size=CELL_SIZE):
+        self.grids = {PLAYER: SpatialHash(cell_size), ENEMY: SpatialHash(cell_size)}
+        self.hurtboxes = {PLAYER: [], ENEMY: []}  # team -> [(rect, owner)]
+        self.hurtbox_rects = {PLAYER: [], ENEMY: []}  # team -> [rect], for collidelistall
+        self.crowded = {PLAYER: False, ENEMY: False}  # team -> hurtboxes in the grid this tick
+        self.hitboxes = []  # (rect, owner, kind, team, data)
+        self.hitfields = []  # (field, owner, kind, team)
+        self.hurtfields = {PLAYER: [], ENEMY: []}  # team -> [field]
+        self.attackers = {PLAYER: 0, ENEMY: 0}  # hitboxes aimed at each team
+        self.latched = {kind: {} for kind in LATCHED}  # kind -> {id: target} latched last tick
+        self.latching = {kind: {} for kind in LATCHED}  # same, filled this tick, then swapped in
+        self.field_latched = {}  # (id(field), kind) -> slots latched this tick
+        self.field_hits = {}  # hitbox index -> [(field, slot)]
+        self.attacker_rows = []  # hitboxes tested against a hurtfield: indices...
+        self.attacker_rects = []  # ...and their rects
+        self.contacts = 0  # contacts delivered in the last resolve()
+        self.tests = 0  # rect tests (done in C) in the last resolve()
+
+    def clear(self):
+        for team in TEAMS:
+            self.hurtboxes[team].clear()
+            self.hurtbox_rects[team].clear()
+            self.hurtfields[team].clear()
+        self.hitboxes.clear()
+        self.hitfields.clear()
+        self.attackers[PLAYER] = self.attackers[ENEMY] = 0
+
+    def add_hurtbox(self, rect, owner, team):
+        self.hurtboxes[team].append((rect, owner))
+        self.hurtbox_rects[team].append(rect)
+
+    def add_hitbox(self, rect, owner, kind, team, data=None):
+        self.hitboxes.append((rect, owner, kind, team, data))
+        self.attackers[ENEMY if team == PLAYER else PLAYER] += 1
+
+    def add_hitfield(self, field, owner, kind, team):
+        """Registers every live entry of a field as a hitbox (tested against hurtboxes)."""
+        self.hitfields.append((field, owner, kind, team))
+
+    def add_hurtfield(self, field, team):
+        """Registers every live entry of a field as a hurtbox (tested against hitboxes)."""
+        self.hurtfields[team].append(field)
+
+    def _broadphase(self):
+        """Fills the grid of every team too crowded for a plain scan."""
+        crowded = self.crowded
+        for team in TEAMS:
+            boxes = self.hurtboxes[team]
+            crowded[team] = len(boxes) * self.attackers[team] > MAX_SCAN_TESTS
+            if crowded[team]:
+                grid = self.grids[team]
+                grid.clear()
+                for index, (rect, _) in enumerate(boxes):
+                    grid.insert(rect, index)
+        return crowded
+
+    def _field_hits(self):
+        """hitbox index -> [(field, slot)], testing each hurtfield once
+        against every hitbox of the other team."""
+        found = self.field_hits
+        found.clear()
+        tests = 0
+        for team in TEAMS:
+            fields = self.hurtfields[team]
+            if not fields or not self.attackers[team]:
+                continue
+            attackers = self.attacker_rows
+            rects = self.attacker_rects
+            attackers.clear()
+            rects.clear()
+            for i, (rect, _, _, hit_team, _) in enumerate(self.hitboxes):
+                if hit_team != team and rect.width > 0 and rect.height > 0:
+                    attackers.append(i)
+                    rects.append(rect)
+            if not attackers:
+                continue
+            for field in fields:
+                tests += field.top * len(rects)
+                for row, slot in field.hit_pairs(rects):
+                    found.setdefault(attackers[row], []).append((field, slot))
+        return found, tests
+
+    def _registered(self, target):
+        for team in TEAMS:
+            for _, owner in self.hurtboxes[team]:
+                if owner is target:
+                    return True
+        return False
+
+    def resolve(self):
+        crowded = self._broadphase()
+        field_hits, tests = self._field_hits()
+        rects = self.hurtbox_rects
+        latched = self.latching
+        for kind, _ in LATCHED_FLAGS:
+            latched[kind].clear()
+        field_latched = self.field_latched
+        field_latched.clear()
+        contacts = 0
+        # Hitfields go first: a minion killed by Bloop this tick still lands
+        # its contact, as when each minion touched Bloop before taking hits
+        for field, owner, kind, team in self.hitfields:
+            other = ENEMY if team == PLAYER else PLAYER
+            for target_rect, target in self.hurtboxes[other]:
+                tests += field.top
+                slots = field.hits(target_rect)
+                if slots:
+                    contacts += len(slots)
+                    owner.on_contact(kind, slots, target)
+        for number, (rect, owner, kind, team, data) in enumerate(self.hitboxes):
+            other = ENEMY if team == PLAYER else PLAYER
+            boxes = self.hurtboxes[other]
+            if crowded[other]:
+                hits, tested = self.grids[other].query(rect)
+            else:
+                hits, tested = rect.collidelistall(rects[other]), len(boxes)
+            tests += tested
+            for index in hits:
+                target = boxes[index][1]
+                if target is owner:
+                    continue
+                contacts += 1
+                owner.on_contact(kind, data, target)
+                if kind in latched:
+                    latched[kind][id(target)] = target
+            if number in field_hits:
+                for field, slot in field_hits[number]:
+                    contacts += 1
+                    owner.on_contact(kind, data, field.member(slot))
+                    if kind in latched:
+                        field_latched.setdefault((id(field), kind), []).append(slot)
+        self.contacts = contacts
+        self.tests = tests
+        # Latches are released once the boxes no longer touch; a target that
+        # sat this pass out (ReGlobulus transforming) keeps its latch
+        for kind, flag in LATCHED_FLAGS:
+            hit = latched[kind]
+            for key, target in self.latched[kind].items():
+                if key in hit:
+                    continue
+                if self._registered(target):
+                    setattr(target, flag, False)
+                else:
+                    hit[key] = target
+            for team in TEAMS:
+                for field in self.hurtfields[team]:
+                    field.release(flag, field_latched.get((id(field), kind), []))
+        self.latched, self.latching = latched, self.latched
+
+    def run(self, bloop, boss):
+        """Registers everything in the fight, resolves the contacts and lets the
+        boss check them (defeat, phase change) before the tick ends."""
+        self.clear()
+        bloop.register_colliders(self)
+        boss.register_colliders(self)
+        self.resolve()
+        boss.after_contacts(bloop)
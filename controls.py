@@ -0,0 +1,35 @@
+import pygame
+
+# === Controlli di Bloop ===
+# The five keys Bloop reacts to, in bit order. A whole tick of input fits in
+# one byte, which is what simulations feed in and what replays store.
+CONTROLS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE, pygame.K_1, pygame.K_2)
+KEY_NAMES = {"LEFT": pygame.K_LEFT, "RIGHT": pygame.K_RIGHT, "SPACE": pygame.K_SPACE, "1": pygame.K_1, "2": pygame.K_2}
+KEY_BITS = {key: 1 << i for i, key in enumerate(CONTROLS)}
+
+
+class KeyState:
+    """Stand-in for pygame.key.get_pressed() backed by a bitmask over CONTROLS."""
+    def __init__(self, mask=0):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        return bool(self.mask & KEY_BITS.get(key, 0))
+
+    @classmethod
+    def from_names(cls, names):
+        mask = 0
+        for name in names:
+            mask |= KEY_BITS[KEY_NAMES[name]]
+        return cls(mask)
+
+
+def mask(keys):
+    """Bitmask of the CONTROLS held in keys (a KeyState or get_pressed() result)."""
+    if isinstance(keys, KeyState):
+        return keys.mask
+    result = 0
+    for key, bit in KEY_BITS.items():
+        if keys[key]:
+            result |= bit
+    return result
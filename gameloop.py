@@ -0,0 +1,249 @@
+import os
+import time
+import tracemalloc
+import pygame
+import collision
+import render
+import profiler
+import tracing
+import telemetry
+
+# === Loop a passo fisso ===
+# Game logic advances in fixed steps of STEP_MS, independent of how often the
+# screen is drawn. Every entity is tuned per logic step (vel_x = 5, gravity = 1,
+# frame_timer counts steps), so LOGIC_HZ stays at the 60 Hz the game was
+# balanced for; rendering can run at any rate and draws positions
+# interpolated between the last two logic steps. Entity timers read a
+# simclock.VirtualClock that advances by STEP_MS per logic step, so cooldowns
+# follow simulated time as well.
+LOGIC_HZ = 60
+STEP_MS = 1000 / LOGIC_HZ
+MAX_STEPS_PER_FRAME = 5  # oltre questo il tempo rallenta invece di accumulare
+SNAP_DISTANCE = 100  # teleports and respawns are not interpolated
+BACKGROUND = (200, 230, 255)  # sfondo azzurrino
+# Dirty-rect presenting (render.DirtyRects) instead of fill + flip, for
+# machines where pushing the whole 800x600 frame is the expensive part
+DIRTY_RECTS = os.environ.get("SLIME_SOULS_DIRTY_RECTS", "0") != "0"
+# Trace-event JSON of every frame (tracing.Tracer), written here if set
+TRACE_PATH = os.environ.get("SLIME_SOULS_TRACE") or None
+# Heap growth in the F3 overlay; tracemalloc slows every allocation, so only
+# when asked for (SLIME_SOULS_TRACEMALLOC=1)
+TRACEMALLOC = os.environ.get("SLIME_SOULS_TRACEMALLOC", "0") != "0"
+
+
+class FixedTimestep:
+    """Accumulates frame time and reports how many logic steps to run."""
+    def __init__(self, step_ms=STEP_MS, max_steps=MAX_STEPS_PER_FRAME):
+        self.step_ms = step_ms
+        self.max_steps = max_steps
+        self.accumulator = 0
+        self.steps = 0  # logic steps run since start
+
+    def advance(self, frame_ms):
+        self.accumulator += frame_ms
+        steps = int(self.accumulator // self.step_ms)
+        if steps > self.max_steps:
+            # Overloaded for too long: drop the backlog rather than spiral
+            steps = self.max_steps
+            self.accumulator = self.step_ms * steps
+        self.accumulator -= steps * self.step_ms
+        self.steps += steps
+        return steps
+
+    @property
+    def sim_time(self):
+        """Simulated milliseconds elapsed, counted in whole logic steps."""
+        return self.steps * self.step_ms
+
+    @property
+    def alpha(self):
+        """How far the renderer is between the last two logic steps (0..1)."""
+        return self.accumulator / self.step_ms
+
+
+def _get_pos(obj):
+    if isinstance(obj, dict):
+        return obj["x"], obj["y"]
+    return obj.x, obj.y
+
+
+def _set_pos(obj, x, y):
+    if isinstance(obj, dict):
+        obj["x"], obj["y"] = x, y
+    else:
+        obj.x, obj.y = x, y
+
+
+class Interpolator:
+    """Temporarily moves entities to their interpolated position while drawing."""
+    def __init__(self):
+        self.previous = {}
+        self.restore = []
+
+    def snapshot(self, objects):
+        # The object itself is kept so its id() cannot be reused meanwhile.
+        # Containers with an interpolate() method track their own history.
+        self.previous = {id(obj): (obj, _get_pos(obj)) for obj in objects if not hasattr(obj, "interpolate")}
+
+    def apply(self, objects, alpha):
+        self.restore = []
+        for obj in objects:
+            if hasattr(obj, "interpolate"):
+                obj.interpolate(alpha)
+                self.restore.append((obj, None, None, None))
+                continue
+            entry = self.previous.get(id(obj))
+            if entry is None:
+                continue
+            (px, py), (x, y) = entry[1], _get_pos(obj)
+            if abs(x - px) > SNAP_DISTANCE or abs(y - py) > SNAP_DISTANCE:
+                continue
+            rect = getattr(obj, "rect", None)
+            self.restore.append((obj, x, y, rect.topleft if rect is not None else None))
+            ix, iy = px + (x - px) * alpha, py + (y - py) * alpha
+            _set_pos(obj, ix, iy)
+            if rect is not None:
+                rect.topleft = (ix, iy)
+
+    def undo(self):
+        for obj, x, y, rect_pos in self.restore:
+            if x is None:
+                obj.interpolate(1.0)
+                continue
+            _set_pos(obj, x, y)
+            if rect_pos is not None:
+                obj.rect.topleft = rect_pos
+        self.restore = []
+
+
+def moving_objects(bloop, boss):
+    """Everything that moves and draws from its own x/y."""
+    yield bloop
+    yield bloop.projectiles
+    yield boss
+    for attr in ("minions", "salsa_projectiles", "slime_balls"):
+        swarm = getattr(boss, attr, None)
+        if swarm is not None:
+            yield swarm
+    sir_blub = getattr(boss, "spawned_sir_blub", None)
+    if sir_blub is not None:
+        yield sir_blub
+        yield sir_blub.minions
+
+
+def run(screen, bloop, boss, health_bar, sim_clock, render_fps=60, input_source=None, recorder=None,
+        dirty_rects=None, trace_path=None):
+    """Runs a level until the window is closed. render_fps=0 means uncapped.
+
+    sim_clock is the VirtualClock the entities were created with. Input comes
+    from the keyboard unless an input_source (e.g. a ReplayInput) is given;
+    a replay.Recorder, if passed, receives every tick's input and is saved
+    when the fight ends, including by defeat. dirty_rects picks the
+    presenting mode, DIRTY_RECTS (SLIME_SOULS_DIRTY_RECTS=1) by default;
+    trace_path, TRACE_PATH (SLIME_SOULS_TRACE=file.json) by default, turns
+    on the Chrome trace of the fight.
+    """
+    if dirty_rects is None:
+        dirty_rects = DIRTY_RECTS
+    trace_path = trace_path or TRACE_PATH
+    tracer = tracing.Tracer(trace_path) if trace_path else None
+    try:
+        if tracer is not None:
+            tracer.install()
+        _run(screen, bloop, boss, health_bar, sim_clock, render_fps, input_source, recorder, dirty_rects, tracer)
+    finally:
+        if tracer is not None:
+            tracer.close()
+        if recorder is not None and recorder.path:
+            recorder.save()
+
+
+def _run(screen, bloop, boss, health_bar, sim_clock, render_fps, input_source, recorder, dirty_rects, tracer):
+    clock = pygame.time.Clock()
+    timestep = FixedTimestep()
+    interpolator = Interpolator()
+    stage = collision.CollisionStage()
+    summon_stage = collision.CollisionStage()  # the pass of a boss the boss summoned
+    queue = render.RenderQueue()
+    presenter = render.DirtyRects(BACKGROUND) if dirty_rects else None
+    frames = profiler.FrameProfiler(tracer=tracer)  # F3 mostra dove va il tempo di ogni frame
+    if TRACEMALLOC and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    gauges = telemetry.Telemetry(bloop, boss)
+    frame_count = 0
+    boss_render = f"{type(boss).__name__}.render"
+    perf = time.perf_counter
+    running = True
+    clock.tick()
+
+    while running:
+        start = perf()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE) and presenter is not None:
+                presenter.invalidate()
+            elif event.type == pygame.KEYDOWN and event.key == profiler.TOGGLE_KEY:
+                frames.toggle()
+
+        keys = pygame.key.get_pressed()
+        update_start = perf()
+        frames.add("input", start, update_start)
+        for _ in range(timestep.advance(clock.get_time())):
+            interpolator.snapshot(moving_objects(bloop, boss))
+            sim_clock.advance(timestep.step_ms)
+            if input_source is not None:
+                keys = input_source.next()
+            if recorder is not None:
+                recorder.record(keys)
+            start = perf()
+            bloop.update(keys)
+            bloop_done = perf()
+            section = frames.boss_section(boss)
+            boss.update(bloop)
+            boss_done = perf()
+            stage.run(bloop, boss)
+            collisions_done = perf()
+            frames.add("Bloop.update", start, bloop_done)
+            frames.add(section, bloop_done, boss_done)
+            frames.add("collisions", boss_done, collisions_done)
+            # ReGlobulus's Sir Blub acts once his summoner's defeat check is past
+            summon = boss.summoned()
+            if summon is not None:
+                section = frames.boss_section(summon)
+                summon.update(bloop)
+                summon_done = perf()
+                summon_stage.run(bloop, summon)
+                frames.add(section, collisions_done, summon_done)
+                frames.add("summon.collisions", summon_done, perf())
+        frames.add("update", update_start, perf())
+
+        interpolator.apply(moving_objects(bloop, boss), timestep.alpha)
+        start = perf()
+        bloop.render(queue)
+        bloop_done = perf()
+        health_bar.render(queue)
+        hud_done = perf()
+        boss.render(queue)
+        boss_done = perf()
+        interpolator.undo()
+        if frames.visible and (frame_count % telemetry.SAMPLE_FRAMES == 0 or not frames.gauges):
+            frames.gauges = gauges.sample()
+        frame_count += 1
+        frames.render(queue)
+        frames.add("Bloop.render", start, bloop_done)
+        frames.add("HealthBar.render", bloop_done, hud_done)
+        frames.add(boss_render, hud_done, boss_done)
+        start = perf()
+        if presenter is not None:
+            presenter.present(screen, queue)
+            frames.add("present", start, perf())
+        else:
+            screen.fill(BACKGROUND)
+            queue.flush(screen)
+            blits_done = perf()
+            pygame.display.flip()
+            frames.add("blits", start, blits_done)
+            frames.add("flip", blits_done, perf())
+        frames.end_frame()
+        clock.tick(render_fps)
@@ -0,0 +1,136 @@
+import numpy as np
+
+# === Pericoli in caduta ===
+# Salsa drops and slime balls live in one HazardField per boss: NumPy arrays
+# for positions, velocities and damage instead of a dict or an object per
+# hazard. Gravity, the ground test and the hit test against Bloop are a few
+# vector operations per tick whatever the number of hazards in the air, so a
+# boss can rain hundreds of them.
+# The per-tick ops run in place on the whole arrays, with scratch masks and
+# 0-d arrays for the scalars: slicing to the live slots or handing a ufunc a
+# Python float would allocate a new array object on every call.
+CAPACITY = 64
+
+
+class HazardField:
+    """Falling hazards of one size, spawned by a boss and drawn with one image."""
+    ARRAYS = ("x", "y", "hit_y", "prev_y", "vel_y", "damage", "active", "mask", "test")
+
+    def __init__(self, size, gravity, floor, capacity=CAPACITY, round_y=False):
+        self.width, self.height = size
+        self.gravity = np.array(gravity, dtype=float)
+        self.floor = np.array(floor, dtype=float)  # a hazard whose top reaches this y is spent
+        # Hit tests use y the way the hazard's Rect held it: truncated, as
+        # pygame.Rect(x, y, w, h) does, or rounded half away from zero, as
+        # moving a rect with rect.topleft = (x, y) does
+        self.round_y = round_y
+        self.x = np.zeros(capacity)  # whole pixels, hazards only fall
+        self.y = np.zeros(capacity)
+        self.hit_y = np.zeros(capacity)  # y as the hazard's Rect holds it
+        self.prev_y = np.zeros(capacity)
+        self.vel_y = np.zeros(capacity)
+        self.damage = np.zeros(capacity, dtype=np.int32)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.mask = np.zeros(capacity, dtype=bool)  # scratch for update() and hits()
+        self.test = np.zeros(capacity, dtype=bool)
+        # Edges hits() tests against, as 0-d arrays: right, left, bottom, top
+        self.bounds = tuple(np.zeros(()) for _ in range(4))
+        self.half = np.array(0.5)
+        self.top = 0  # slots past this are unused; spawn() fills them in order
+        self.alpha = 1.0  # interpolation factor used by render()
+
+    def __len__(self):
+        return int(np.count_nonzero(self.active))
+
+    def _compact(self):
+        """Packs live hazards to the front (in spawn order), growing when all are live."""
+        live = np.flatnonzero(self.active[:self.top])
+        n = len(live)
+        if n == len(self.active):
+            for name in self.ARRAYS:
+                array = getattr(self, name)
+                setattr(self, name, np.concatenate((array, np.zeros_like(array))))
+        else:
+            for name in self.ARRAYS:
+                array = getattr(self, name)
+                array[:n] = array[live]
+            self.active[n:] = False
+        self.top = n
+
+    def spawn(self, x, y, vel_y, damage):
+        """Drops a hazard; returns its slot, valid until the next spawn."""
+        if self.top == len(self.active):
+            self._compact()
+        i = self.top
+        self.x[i] = int(x)
+        self.y[i] = self.prev_y[i] = y
+        self.hit_y[i] = int(y + 0.5 if y >= 0 else y - 0.5) if self.round_y else int(y)
+        self.vel_y[i] = vel_y
+        self.damage[i] = damage
+        self.active[i] = True
+        self.top += 1
+        return i
+
+    def retire(self, i):
+        self.active[i] = False
+
+    def update(self):
+        if not self.top:
+            return
+        y = self.y
+        vel_y = self.vel_y
+        hit_y = self.hit_y
+        np.copyto(self.prev_y, y)
+        # Spent and unused slots fall too: nothing reads them, and a where=
+        # mask would cost the ufunc a buffer every tick
+        vel_y += self.gravity
+        y += vel_y
+        np.less(y, self.floor, out=self.mask)
+        self.active &= self.mask
+        if self.round_y:
+            np.abs(y, out=hit_y)
+            hit_y += self.half
+            np.floor(hit_y, out=hit_y)
+            np.copysign(hit_y, y, out=hit_y)
+        else:
+            np.trunc(y, out=hit_y)
+        if not np.count_nonzero(self.active):
+            self.top = 0
+
+    def hits(self, rect):
+        """Slots of the live hazards overlapping rect, in spawn order."""
+        if not self.top or rect.width <= 0 or rect.height <= 0:
+            return []
+        right, left, bottom, top = self.bounds
+        right.fill(rect.right)
+        left.fill(rect.left - self.width)
+        bottom.fill(rect.bottom)
+        top.fill(rect.top - self.height)
+        hit = self.mask
+        test = self.test
+        np.less(self.x, right, out=hit)
+        hit &= self.active
+        np.greater(self.x, left, out=test)
+        hit &= test
+        np.less(self.hit_y, bottom, out=test)
+        hit &= test
+        np.greater(self.hit_y, top, out=test)
+        hit &= test
+        if not np.count_nonzero(hit):
+            return []
+        return np.flatnonzero(hit).tolist()
+
+    def interpolate(self, alpha):
+        self.alpha = alpha
+
+    def render(self, queue, layer, image):
+        live = np.flatnonzero(self.active[:self.top])
+        if not len(live):
+            return
+        prev_y = self.prev_y[live]
+        y = prev_y + (self.y[live] - prev_y) * self.alpha
+        queue.extend(layer, [(image, pos) for pos in zip(self.x[live].tolist(), y.tolist())])
+
+    def clear(self):
+        self.active[:] = False
+        self.top = 0
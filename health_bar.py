@@ -1,20 +1,37 @@
-
-import pygame
+import hud
 class HealthBar:
     def __init__(self, bloop):
         self.bloop = bloop
         self.position = (20, 20)
         self.size = (200, 20)
+        self.bar = hud.Bar(self.size, (255, 0, 0))
+        self.widgets = []  # (widget, position, state) disegnati dopo la barra, nessuno di default
+
+    def add(self, widget, position, state):
+        """Adds a HUD widget; state() returns its render arguments every frame."""
+        self.widgets.append((widget, position, state))
+
+    def add_cooldowns(self):
+        """Ricarica degli attacchi sotto la barra: pugno a sinistra, palla a destra."""
+        bloop = self.bloop
+        self.add(hud.Bar((98, 4), (255, 255, 255)), (20, 44),
+                 lambda: (self.charge(bloop.last_melee_attack, bloop.melee_cooldown),))
+        self.add(hud.Bar((98, 4), (0, 200, 0)), (122, 44),
+                 lambda: (self.charge(bloop.last_ranged_attack, bloop.ranged_cooldown),))
+
+    def add_boss_label(self, boss, name=None, position=(20, 52)):
+        """The boss's name, with its phase once it has more than one."""
+        name = name or type(boss).__name__
+        self.add(hud.Label(18), position,
+                 lambda: (name if getattr(boss, "phase", 1) == 1 else f"{name} - Phase {boss.phase}",))
+
+    def charge(self, last_use, cooldown):
+        return (self.bloop.clock.now() - last_use) / cooldown
 
-    def draw(self, screen):
+    def render(self, queue):
         # Calcolo percentuale
         hp_ratio = self.bloop.current_hp / self.bloop.max_hp
-        # Sfondo barra
-        pygame.draw.rect(screen, (50, 50, 50), (*self.position, *self.size))
-        # Barra vita
-        pygame.draw.rect(screen, (255, 0, 0), (
-            self.position[0],
-            self.position[1],
-            self.size[0] * hp_ratio,
-            self.size[1]
-        ))
\ No newline at end of file
+        # Barra vita, ridisegnata solo quando cambia di un pixel
+        self.bar.render(queue, self.position, hp_ratio)
+        for widget, position, state in self.widgets:
+            widget.render(queue, position, *state())
@@ -0,0 +1,66 @@
+import pygame
+import render
+
+# === HUD ===
+# Health bars and labels are pre-rendered surfaces. Every frame a widget
+# reduces its state to a key (a bar's filled width in whole pixels and its
+# colour, a label's text) and redraws its surface only when the key changes;
+# otherwise it costs one entry in the render queue's HUD layer, however many
+# widgets there are.
+BAR_BACKGROUND = (50, 50, 50)
+LABEL_COLOR = (255, 255, 255)
+
+
+class Widget:
+    """Base class: quantize(*state) gives the key, redraw(key) the surface."""
+    def __init__(self):
+        self.key = None
+        self.surface = None
+        self.redraws = 0  # surfaces drawn so far, for the benches
+
+    def render(self, queue, pos, *state):
+        key = self.quantize(*state)
+        if key != self.key:
+            self.surface = self.redraw(key)
+            self.key = key
+            self.redraws += 1
+        queue.add(render.HUD, self.surface, pos)
+
+
+class Bar(Widget):
+    """A bar filled to a ratio between 0 and 1, e.g. health or a cooldown."""
+    def __init__(self, size, color, background=BAR_BACKGROUND):
+        super().__init__()
+        self.size = size
+        self.color = color
+        self.background = background
+
+    def quantize(self, ratio, color=None):
+        # Truncated like the pygame.Rect the bars used to be drawn with
+        filled = min(max(int(self.size[0] * ratio), 0), self.size[0])
+        return filled, color or self.color
+
+    def redraw(self, key):
+        filled, color = key
+        surface = pygame.Surface(self.size)
+        surface.fill(self.background)
+        surface.fill(color, (0, 0, filled, self.size[1]))
+        return surface
+
+
+class Label(Widget):
+    """A line of text, e.g. a boss name or its phase."""
+    def __init__(self, size=24, color=LABEL_COLOR, font_name=None):
+        super().__init__()
+        self.size = size
+        self.color = color
+        self.font_name = font_name
+        self.font = None  # opened on the first redraw, pygame.font needs init()
+
+    def quantize(self, text):
+        return text
+
+    def redraw(self, text):
+        if self.font is None:
+            self.font = pygame.font.SysFont(self.font_name, self.size)
+        return self.font.render(text, True, self.color)
@@ -1,40 +1,39 @@
-import pygame
 import os
 import sys
+import random
 from bloop import Bloop
 from health_bar import HealthBar
+import gameloop
+import window
+import simclock
+import replay as replays
 from reglobulus import ReGlobulus
+from sirBlub import SirBlub
 # === Configurazione iniziale ===
-def main_loop():
-    pygame.init()
-    WIDTH, HEIGHT = 800, 600
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    clock = pygame.time.Clock()
+LEVEL = 3
 
-    reglobulus = ReGlobulus(400, HEIGHT - 64)
-    bloop = Bloop(100, HEIGHT - 64)
-    health_bar = HealthBar(bloop)
-    running = True
-
-    while running:
-        screen.fill((200, 230, 255))  # sfondo azzurrino
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+def preload():
+    """Loads the level's sprites into the asset caches (run by the menu's preloader)."""
+    HEIGHT = window.HEIGHT
+    sim_clock = simclock.VirtualClock()
+    ReGlobulus(400, HEIGHT - 64, sim_clock, random.Random(0))
+    SirBlub(400, HEIGHT - 64, sim_clock, random.Random(0))  # evocato in fase 2
+    HealthBar(Bloop(100, HEIGHT - 64, sim_clock))
 
-        keys = pygame.key.get_pressed()
-        bloop.update(keys)
-        bloop.draw(screen)
-        health_bar.draw(screen)
-        reglobulus.update(bloop)
-        reglobulus.draw(screen)
 
-        keys = pygame.key.get_pressed()
-        
+def main_loop(render_fps=60, seed=None, record=None, replay=None):
+    HEIGHT = window.HEIGHT
+    screen = window.open()  # la finestra del menu, se già aperta
 
-        pygame.display.flip()
-        clock.tick(60)
+    seed = replays.fight_seed(seed, replay)
+    sim_clock = simclock.VirtualClock()
+    reglobulus = ReGlobulus(400, HEIGHT - 64, sim_clock, random.Random(seed))
+    bloop = Bloop(100, HEIGHT - 64, sim_clock)
+    health_bar = HealthBar(bloop)
+    recorder = replays.Recorder(LEVEL, seed, record) if record else None
+    input_source = replay.input() if replay is not None else None
+    gameloop.run(screen, bloop, reglobulus, health_bar, sim_clock, render_fps, input_source, recorder)
 
-    pygame.quit()
+    window.close()
     sys.exit()
\ No newline at end of file
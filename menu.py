@@ -1,22 +1,38 @@
-import pygame
+import time
+START = time.perf_counter()  # --profile-startup misura da qui
+
 import sys
-import subprocess
 import os
-import main
-import livello2
-import livello3
+import pygame
+import window
+from preload import Preloader
+
+# === Avvio ===
+# Only pygame and the window are needed to show the menu: a level module,
+# and with it Bloop, its boss and their sprites, is imported when the level
+# is selected. The window opened here is the one the level keeps using.
+# Once the menu is on screen a Preloader loads the highlighted level's
+# sprites in the background (then its neighbours'), so starting it only
+# waits for whatever is left. --profile-startup prints how long each
+# startup step took, up to the first menu frame, and the wait at level start.
+PROFILE_STARTUP = "--profile-startup" in sys.argv[1:]
+startup = [("import", time.perf_counter())]
 
-pygame.init()
-screen = pygame.display.set_mode((800, 600))
-pygame.display.set_caption("Select level")
+screen = window.open("Select level")
+startup.append(("display", time.perf_counter()))
 font = pygame.font.SysFont(None, 48)
+startup.append(("font", time.perf_counter()))
 
 WHITE = (255, 255, 255)
 GRAY = (30, 30, 30)
 BLUE = (0, 100, 255)
 YELLOW = (255, 255, 0)
+# Il menu dorme in pygame.event.wait finché non arriva un evento; questo è
+# il risveglio massimo, per eventuali animazioni
+MENU_WAIT_MS = 500
+BUTTON_SIZE = (300, 60)
 
-# Livelli
+# Livelli, importati solo quando scelti
 levels = [
     {"label": "Level 1: Sir Blub", "file": "main.py", "number": 1},
     {"label": "Level 2: Chef Plu", "file": "livello2.py", "number": 2},
@@ -33,43 +49,106 @@ def get_resource_path(relative_path):
     # Quando è in sviluppo
     return os.path.join(os.path.dirname(__file__), relative_path)
 
+# === Disegno del menu ===
+# Text and buttons are rendered once and kept: font.render runs once per
+# (text, color), each level button once per state (normal or selected).
+glyphs = {}
+buttons = {}
+
+def text(label, color=WHITE):
+    surface = glyphs.get((label, color))
+    if surface is None:
+        surface = glyphs[(label, color)] = font.render(label, True, color)
+    return surface
+
+def button(i, selected):
+    surface = buttons.get((i, selected))
+    if surface is None:
+        surface = buttons[(i, selected)] = pygame.Surface(BUTTON_SIZE)
+        surface.fill(YELLOW if selected else BLUE)
+        surface.blit(text(levels[i]["label"]), (20, 10))
+    return surface
+
 def draw_menu():
     screen.fill(GRAY)
-    title = font.render("Select level", True, WHITE)
-    screen.blit(title, (250, 50))
+    screen.blit(text("Select level"), (250, 50))
 
-    for i, level in enumerate(levels):
-        color = YELLOW if i == selected_index else BLUE
-        rect = pygame.Rect(250, 150 + i * 100, 300, 60)
-        pygame.draw.rect(screen, color, rect)
-        label = font.render(level["label"], True, WHITE)
-        screen.blit(label, (rect.x + 20, rect.y + 10))
+    for i in range(len(levels)):
+        screen.blit(button(i, i == selected_index), (250, 150 + i * 100))
+
+def report_startup():
+    """Prints the time spent in each startup step, in ms."""
+    previous = START
+    for step, at in startup:
+        print(f"{step:>12}: {(at - previous) * 1000:7.1f} ms")
+        previous = at
+    print(f"{'first frame':>12}: {(previous - START) * 1000:7.1f} ms total")
+    sys.stdout.flush()
+
+def level_module(number):
+    # Import locali: caricati solo qui, ma ancora visibili a PyInstaller
+    if number == 1:
+        import main as level
+    elif number == 2:
+        import livello2 as level
+    else:
+        import livello3 as level
+    return level
+
+def preload_level(number):
+    level_module(number).preload()
+
+preloader = Preloader(preload_level)
+
+def preload_around(index):
+    """Queues the highlighted level, then the ones next to it."""
+    count = len(levels)
+    preloader.request([levels[(index + step) % count]["number"] for step in (0, 1, -1)])
+
+def start_level(number):
+    waited = preloader.wait(number)
+    preloader.request([])  # niente altro in background durante la partita
+    if PROFILE_STARTUP:
+        print(f"level {number}: waited {waited * 1000:.1f} ms for its sprites")
+        sys.stdout.flush()
+    level_module(number).main_loop()
 
 def menu_loop():
+    """Redraws only when something changed and otherwise sleeps in event.wait."""
     global selected_index
-    clock = pygame.time.Clock()
+    first_frame = True
+    redraw = True
 
     while True:
-        draw_menu()
-        pygame.display.flip()
-        clock.tick(60)
+        if redraw:
+            redraw = False
+            draw_menu()
+            pygame.display.flip()
+            if first_frame:
+                first_frame = False
+                startup.append(("menu frame", time.perf_counter()))
+                if PROFILE_STARTUP:
+                    report_startup()
+                preload_around(selected_index)
 
-        for event in pygame.event.get():
+        for event in [pygame.event.wait(MENU_WAIT_MS)] + pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
+                window.close()
                 sys.exit()
 
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                redraw = True
+
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_DOWN:
                     selected_index = (selected_index + 1) % len(levels)
+                    preload_around(selected_index)
+                    redraw = True
                 elif event.key == pygame.K_UP:
                     selected_index = (selected_index - 1) % len(levels)
+                    preload_around(selected_index)
+                    redraw = True
                 elif event.key == pygame.K_RETURN:
-                    if levels[selected_index]["number"] == 1:
-                        main.main_loop()
-                    elif levels[selected_index]["number"] == 2:
-                        livello2.main_loop()
-                    elif levels[selected_index]["number"] == 3:
-                        livello3.main_loop()
+                    start_level(levels[selected_index]["number"])
 
 menu_loop()
@@ -0,0 +1,320 @@
+import os
+import sys
+import json
+import random
+import itertools
+import time
+import tracemalloc
+
+# === Micro-benchmark ===
+# Times the per-tick hot functions in isolation against an offscreen surface,
+# with a fixed amount of live state (projectiles, minions, hazards), and
+# reports ops/sec plus allocations per call:
+#   alloc_bytes  transient Python heap bytes a call peaks at (tracemalloc)
+#   net_blocks   Python blocks still alive after the call (growth/leaks)
+# The tick.<Boss> benches run a whole logic tick of a fight (Bloop, the boss,
+# collisions) on random input once it has settled; the steady-state tick is
+# meant to allocate close to nothing. tracemalloc's byte counts depend on the
+# interpreter and platform, so budgets are relative: --baseline takes the
+# --json output of an earlier run on the same machine (CI runs the previous
+# commit first) and fails a bench that now allocates noticeably more.
+# --max-alloc-bytes sets an absolute limit for local runs.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # stdout is JSON
+
+import pygame
+import gameloop
+import window
+import collision
+import render
+import simclock
+import benchmark
+from simulate import RandomInput
+from controls import KeyState
+from bloop import Bloop
+from health_bar import HealthBar
+from miniBlub import MiniBlubSwarm
+from sirBlub import SirBlub
+from chefPlu2 import ChefPlu
+from reglobulus import ReGlobulus, FireLine
+from hazards import HazardField
+
+WIDTH, HEIGHT = 800, 600
+ITERATIONS = 20000
+ALLOC_SAMPLES = 500
+PROJECTILES = 50
+MINIONS = 20
+HORDE = 2000  # minions in the MiniBlubSwarm benches, a horde level
+HAZARDS = 50
+TICK_WARMUP = 3600  # a minute of fight before a tick counts as steady state
+TICK_INPUTS = 3600  # random input ticks, cycled
+# --baseline: a bench fails above its baseline alloc_bytes times 1 + this...
+ALLOC_GROWTH = 0.2
+ALLOC_SLACK = 48  # ...plus this many bytes, about one small object
+
+
+class Fixture:
+    """Bloop plus one boss with controlled live state, sharing a virtual clock."""
+    def __init__(self, boss_class, seed=0):
+        self.clock = simclock.VirtualClock(10000)
+        self.rng = random.Random(seed)
+        self.screen = pygame.Surface((WIDTH, HEIGHT))
+        self.queue = render.RenderQueue()
+        self.bloop = Bloop(100, HEIGHT - 64, self.clock)
+        self.keys = KeyState()
+        self.boss = boss_class(400, HEIGHT - 64, self.clock, self.rng)
+        self.hazards = None  # the boss's HazardField, kept at HAZARDS live drops
+        self.fill_projectiles()
+
+    def fill_projectiles(self):
+        """Tops the pool back up to PROJECTILES live shots (hits and exits retire them)."""
+        pool = self.bloop.projectiles
+        while len(pool) < PROJECTILES:
+            pool.spawn(self.rng.randint(0, WIDTH - 64), HEIGHT - 64, self.rng.choice([-10, 10]), 0)
+
+    def fill_hazards(self):
+        while len(self.hazards) < HAZARDS:
+            self.hazards.spawn(self.rng.randint(0, WIDTH - 32), self.rng.randint(-32, HEIGHT - 64), 3, 0)
+
+    def draw(self, entity):
+        """Submits one entity to the render queue and flushes it."""
+        entity.render(self.queue)
+        self.queue.flush(self.screen)
+
+    def step(self):
+        self.fill_projectiles()
+        if self.hazards is not None:
+            self.fill_hazards()
+        self.clock.advance(gameloop.STEP_MS)
+        self.bloop.current_hp = self.bloop.max_hp
+        self.boss.current_hp = self.boss.max_hp
+
+
+def bench_bloop_update():
+    f = Fixture(SirBlub)
+    keys = [KeyState(0b00010), KeyState(0b00001)]  # avanti e indietro
+
+    def call():
+        f.step()
+        f.bloop.update(keys[int(f.clock.now() // 1000) % 2])
+    return call
+
+
+def bench_bloop_draw():
+    f = Fixture(SirBlub)
+    return lambda: f.draw(f.bloop)
+
+
+def bench_boss(boss_class, method):
+    def setup():
+        f = Fixture(boss_class)
+        if boss_class is SirBlub:
+            for _ in range(MINIONS):
+                f.boss.minions.spawn(f.rng.randint(0, WIDTH - 32), HEIGHT - 32)
+        elif boss_class is ChefPlu:
+            f.hazards = f.boss.salsa_projectiles
+            f.fill_hazards()
+        elif boss_class is ReGlobulus:
+            f.hazards = f.boss.slime_balls
+            f.fill_hazards()
+            f.boss.fire_lines = [FireLine(f.rng.randint(0, WIDTH - 64), HEIGHT - 64, 0, 10 ** 9, 64, 64, 0)
+                                 for _ in range(5)]
+        if method == "update":
+            def call():
+                f.step()
+                f.boss.update(f.bloop)
+            return call
+        if method == "draw":
+            return lambda: f.draw(f.boss)
+        if method == "collisions":
+            stage = collision.CollisionStage()
+
+            def call():
+                f.step()
+                stage.run(f.bloop, f.boss)
+            return call
+        return f.boss.update_animation
+    return setup
+
+
+def bench_tick(boss_class):
+    def setup():
+        f = Fixture(boss_class)
+        f.bloop.projectiles.clear()
+        stage = collision.CollisionStage()
+        summon_stage = collision.CollisionStage()
+        inputs = RandomInput(0)
+        keys = itertools.cycle([inputs.next() for _ in range(TICK_INPUTS)])
+
+        def call():
+            benchmark.keep_alive(f.bloop, f.boss)
+            f.clock.advance(gameloop.STEP_MS)
+            f.bloop.update(next(keys))
+            f.boss.update(f.bloop)
+            stage.run(f.bloop, f.boss)
+            summon = f.boss.summoned()
+            if summon is not None:
+                summon.update(f.bloop)
+                summon_stage.run(f.bloop, summon)
+        for _ in range(TICK_WARMUP):
+            call()
+        return call
+    return setup
+
+
+def bench_horde(method):
+    def setup():
+        f = Fixture(SirBlub)
+        swarm = MiniBlubSwarm()
+        for _ in range(HORDE):
+            swarm.spawn(f.rng.randint(0, WIDTH - 32), HEIGHT - 32)
+        if method == "update":
+            return lambda: swarm.update(f.bloop)
+        return lambda: f.draw(swarm)
+    return setup
+
+
+def bench_hazardfield_update():
+    rng = random.Random(0)
+    field = HazardField((32, 32), 0.5, HEIGHT - 32)
+
+    def call():
+        while len(field) < HAZARDS:
+            field.spawn(rng.randint(0, WIDTH - 32), rng.randint(-32, HEIGHT - 64), 0, 0)
+        field.update()
+    return call
+
+
+def bench_fireline_update():
+    line = FireLine(300, HEIGHT - 64, 0, 3000, 64, 64, 0.5)
+    return lambda: line.update(1500)
+
+
+def bench_healthbar_draw():
+    f = Fixture(SirBlub)
+    bar = HealthBar(f.bloop)
+    return lambda: f.draw(bar)
+
+
+def bench_healthbar_widgets_draw():
+    """Bloop's bar with the optional cooldown meters and boss label attached."""
+    f = Fixture(ReGlobulus)
+    bar = HealthBar(f.bloop)
+    bar.add_cooldowns()
+    bar.add_boss_label(f.boss)
+    return lambda: f.draw(bar)
+
+
+BENCHMARKS = {
+    "Bloop.update": bench_bloop_update,
+    "Bloop.draw": bench_bloop_draw,
+    "SirBlub.update": bench_boss(SirBlub, "update"),
+    "SirBlub.draw": bench_boss(SirBlub, "draw"),
+    "SirBlub.update_animation": bench_boss(SirBlub, "update_animation"),
+    "SirBlub.collisions": bench_boss(SirBlub, "collisions"),
+    "ChefPlu.update": bench_boss(ChefPlu, "update"),
+    "ChefPlu.draw": bench_boss(ChefPlu, "draw"),
+    "ChefPlu.update_animation": bench_boss(ChefPlu, "update_animation"),
+    "ChefPlu.collisions": bench_boss(ChefPlu, "collisions"),
+    "ReGlobulus.update": bench_boss(ReGlobulus, "update"),
+    "ReGlobulus.draw": bench_boss(ReGlobulus, "draw"),
+    "ReGlobulus.update_animation": bench_boss(ReGlobulus, "update_animation"),
+    "ReGlobulus.collisions": bench_boss(ReGlobulus, "collisions"),
+    "tick.SirBlub": bench_tick(SirBlub),
+    "tick.ChefPlu": bench_tick(ChefPlu),
+    "tick.ReGlobulus": bench_tick(ReGlobulus),
+    "MiniBlubSwarm.update": bench_horde("update"),
+    "MiniBlubSwarm.draw": bench_horde("draw"),
+    "HazardField.update": bench_hazardfield_update,
+    "FireLine.update": bench_fireline_update,
+    "HealthBar.draw": bench_healthbar_draw,
+    "HealthBar.draw_widgets": bench_healthbar_widgets_draw,
+}
+
+
+def measure_allocations(call, samples=ALLOC_SAMPLES):
+    """Mean transient bytes and net live blocks per call, warm-up excluded."""
+    for _ in range(samples):
+        call()
+    tracemalloc.start()
+    peak_total = 0
+    for _ in range(samples):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += max(0, peak - before)
+    tracemalloc.stop()
+
+    blocks_before = sys.getallocatedblocks()
+    for _ in range(samples):
+        call()
+    net_blocks = (sys.getallocatedblocks() - blocks_before) / samples
+    return peak_total / samples, net_blocks
+
+
+def run(name, iterations=ITERATIONS):
+    call = BENCHMARKS[name]()
+    for _ in range(min(iterations, 1000)):  # warm-up
+        call()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    elapsed = time.perf_counter() - start
+    alloc_bytes, net_blocks = measure_allocations(BENCHMARKS[name]())
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / elapsed,
+        "us_per_call": elapsed / iterations * 1e6,
+        "alloc_bytes": alloc_bytes,
+        "net_blocks": net_blocks,
+    }
+
+
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for per-tick entity functions")
+    parser.add_argument("names", nargs="*", help="benchmark names or prefixes, e.g. SirBlub (default: all)")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    parser.add_argument("--max-alloc-bytes", type=float,
+                        help="fail if a benchmark's mean transient allocation per call is above this")
+    parser.add_argument("--baseline",
+                        help="--json output of an earlier run on the same machine and interpreter: "
+                             "fail if a benchmark allocates noticeably more per call than there")
+    args = parser.parse_args(argv)
+
+    names = [n for n in BENCHMARKS if not args.names or any(n.startswith(p) for p in args.names)]
+    if not names:
+        parser.error("no benchmark matches " + ", ".join(args.names))
+
+    window.open()
+    results = {}
+    if not args.json:
+        print(f"{'benchmark':30} {'ops/sec':>12} {'us/call':>9} {'alloc B':>9} {'net blk':>8}")
+    for name in names:
+        results[name] = r = run(name, args.iterations)
+        if not args.json:
+            print(f"{name:30} {r['ops_per_sec']:12.0f} {r['us_per_call']:9.2f} {r['alloc_bytes']:9.0f} {r['net_blocks']:8.2f}")
+    if args.json:
+        print(json.dumps(results, indent=2))
+    limits = {}
+    if args.max_alloc_bytes is not None:
+        limits = dict.fromkeys(results, args.max_alloc_bytes)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for name in results:
+            if name in baseline:
+                limit = baseline[name]["alloc_bytes"] * (1 + ALLOC_GROWTH) + ALLOC_SLACK
+                limits[name] = min(limit, limits.get(name, limit))
+    over = [f"{name}: {results[name]['alloc_bytes']:.0f} B (limit {limit:.0f} B)"
+            for name, limit in limits.items() if results[name]["alloc_bytes"] > limit]
+    if over:
+        print("Allocating too much per call:\n  " + "\n  ".join(over), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,64 +1,216 @@
-import pygame
+import numpy as np
+import assets
+import collision
+import render
+
+# === Sciame di MiniBlub ===
+# All of a boss's minions live in one MiniBlubSwarm: NumPy arrays for
+# position, hp, facing and the alive mask, updated together each tick. Dead
+# minions are compacted away on the next update instead of being parked
+# off-screen forever, and every minion is drawn from the same two frames
+# through a single render queue submission.
+# As in hazards.HazardField, the per-tick ops run in place on the whole
+# arrays with scratch masks and 0-d operands, so they allocate no arrays.
+SIZE = 32
+SPEED = 2
+HP = 1
+CONTACT_DAMAGE = 0.2  # per minion touching Bloop, per tick
+CAPACITY = 64
+# hit_pairs() tests up to this many rects one by one; past it one broadcast
+# over all of them is faster, though it builds temporaries
+LOOP_RECTS = 3
+
 
 class MiniBlub:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.width = 32
-        self.height = 32
-        self.speed = 2
-        self.hp = 1
-        self.hit_registered = False
-        self.alive = True
-
-        # Preload images once
-        self.image_left = pygame.transform.scale(
-            pygame.image.load("images/blub/mini-blub/frame_1.png").convert_alpha(),
-            (self.width, self.height)
-        )
-        self.image_right = pygame.transform.scale(
-            pygame.image.load("images/blub/mini-blub/frame_0.png").convert_alpha(),
-            (self.width, self.height)
-        )
-
-        self.image = self.image_right  # Default facing right
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+    """One minion of a swarm, as seen by on_contact() during a collision pass."""
+    __slots__ = ("swarm", "slot")
+
+    def __init__(self, swarm, slot):
+        self.swarm = swarm
+        self.slot = slot
+
+    @property
+    def melee_hit_registered(self):
+        return bool(self.swarm.melee_hit_registered[self.slot])
+
+    @melee_hit_registered.setter
+    def melee_hit_registered(self, value):
+        self.swarm.melee_hit_registered[self.slot] = value
+
+    def take_damage(self, amount):
+        self.swarm.take_damage(self.slot, amount)
+
+
+class MiniBlubSwarm:
+    ARRAYS = ("x", "prev_x", "y", "hp", "facing_right", "alive", "melee_hit_registered",
+              "step", "mask", "test")
+
+    def __init__(self, capacity=CAPACITY):
+        self.x = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.hp = np.zeros(capacity)
+        self.facing_right = np.zeros(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.melee_hit_registered = np.zeros(capacity, dtype=bool)
+        self.step = np.zeros(capacity)  # scratch for update()
+        self.mask = np.zeros(capacity, dtype=bool)  # scratch for update() and hits()
+        self.test = np.zeros(capacity, dtype=bool)
+        self.target = np.zeros(())  # Bloop's x, as a 0-d operand
+        self.speed = np.array(float(SPEED))
+        # Edges hits() tests against, as 0-d arrays: right, left, bottom, top
+        self.bounds = tuple(np.zeros(()) for _ in range(4))
+        self.top = 0  # minions occupy [:top]; dead ones until the next compact
+        self.dead = 0  # deaths since the last compact
+        self.touching = 0  # minions touching Bloop in the last collision pass
+        self.alpha = 1.0  # interpolation factor used by render()
+
+        # Frames decoded and scaled once, shared by every minion
+        self.image_left = assets.scaled("blub/mini-blub/frame_1", (SIZE, SIZE))
+        self.image_right = assets.scaled("blub/mini-blub/frame_0", (SIZE, SIZE))
+
+    def __len__(self):
+        return self.top - self.dead
+
+    def spawn(self, x, y):
+        if self.top == len(self.alive):
+            for name in self.ARRAYS:
+                array = getattr(self, name)
+                setattr(self, name, np.concatenate((array, np.zeros_like(array))))
+        i = self.top
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = y
+        self.hp[i] = HP
+        self.facing_right[i] = True  # Default facing right
+        self.alive[i] = True
+        self.melee_hit_registered[i] = False
+        self.top += 1
+        return i
+
+    def compact(self):
+        """Drops dead minions, keeping the living ones in spawn order."""
+        keep = np.flatnonzero(self.alive[:self.top])
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self.alive[len(keep):self.top] = False
+        self.top = len(keep)
+        self.dead = 0
+
+    def take_damage(self, slot, amount):
+        self.hp[slot] -= amount
+        if self.hp[slot] <= 0 and self.alive[slot]:
+            self.alive[slot] = False
+            self.dead += 1
 
     def update(self, bloop):
-        # Move toward Bloop
-        if bloop.x < self.x:
-            self.x -= self.speed
-            self.image = self.image_left
-        elif bloop.x > self.x:
-            self.x += self.speed
-            self.image = self.image_right
-
-        # Always update rect position
-        self.rect.topleft = (self.x, self.y)
-
-        if self.rect.colliderect(bloop.get_rect()):
-            bloop.take_damage(0.2)
-        if bloop.melee_active and self.rect.colliderect(bloop.get_melee_rect()):
-            if not self.hit_registered:
-                self.hp -= 4
-                self.hit_registered = True
-        else:
-            self.hit_registered = False
-
-        # --- Danno da proiettili ---
-        for p in bloop.projectiles:
-            if p["active"]:
-                proj_rect = pygame.Rect(p["x"], p["y"], 64, 64)
-                if self.rect.colliderect(proj_rect):
-                    self.hp -= p["damage"]
-                    p["active"] = False
-
-        # --- Morte ---
-        if self.hp <= 0:
-            self.alive = False
-
-    def draw(self, screen):
-        if self.alive:
-            screen.blit(self.image, self.rect)
-        else:
-            self.y = -100
+        if self.dead:
+            self.compact()
+        if not self.top:
+            return
+        x = self.x
+        step = self.step
+        test = self.test
+        np.copyto(self.prev_x, x)
+        # Move toward Bloop; facing is kept while level with Bloop
+        self.target.fill(bloop.x)
+        np.subtract(self.target, x, out=step)
+        np.sign(step, out=step)
+        np.greater(step, 0, out=test)
+        self.facing_right |= test
+        np.greater_equal(step, 0, out=test)
+        self.facing_right &= test
+        step *= self.speed
+        x += step
+
+    # === Collisioni ===
+    # The swarm registers once as a hurtfield (Bloop's melee and shots) and
+    # once as a hitfield (touching Bloop); hits(rect) gives the slots involved.
+    def register_colliders(self, stage):
+        self.touching = 0
+        if len(self):
+            stage.add_hurtfield(self, collision.ENEMY)
+            stage.add_hitfield(self, self, "body", collision.ENEMY)
+
+    def hits(self, rect):
+        """Slots of the living minions overlapping rect, in spawn order."""
+        if not self.top or rect.width <= 0 or rect.height <= 0:
+            return []
+        right, left, bottom, top = self.bounds
+        right.fill(rect.right)
+        left.fill(rect.left - SIZE)
+        bottom.fill(rect.bottom)
+        top.fill(rect.top - SIZE)
+        hit = self.mask
+        test = self.test
+        np.less(self.x, right, out=hit)
+        hit &= self.alive
+        np.greater(self.x, left, out=test)
+        hit &= test
+        np.less(self.y, bottom, out=test)
+        hit &= test
+        np.greater(self.y, top, out=test)
+        hit &= test
+        if not np.count_nonzero(hit):
+            return []
+        return np.flatnonzero(hit).tolist()
+
+    def hit_pairs(self, rects):
+        """(rect index, slot) of every overlap between non-empty rects and
+        living minions, ordered by rect then slot."""
+        n = self.top
+        if not n or not rects:
+            return []
+        if len(rects) <= LOOP_RECTS:
+            pairs = []
+            for row, rect in enumerate(rects):
+                for slot in self.hits(rect):
+                    pairs.append((row, slot))
+            return pairs
+        boxes = np.fromiter((v for rect in rects for v in rect), np.int64, 4 * len(rects)).reshape(-1, 4)
+        left = boxes[:, 0:1]
+        top = boxes[:, 1:2]
+        x = self.x[:n]
+        y = self.y[:n]
+        hit = (self.alive[:n] & (x < left + boxes[:, 2:3]) & (x > left - SIZE)
+               & (y < top + boxes[:, 3:4]) & (y > top - SIZE))
+        rows, slots = np.nonzero(hit)
+        return list(zip(rows.tolist(), slots.tolist()))
+
+    def member(self, slot):
+        return MiniBlub(self, slot)
+
+    def release(self, flag, slots):
+        """Clears a latch flag on every minion except the given slots."""
+        latch = getattr(self, flag)
+        if not slots:
+            latch.fill(False)
+            return
+        held = latch[slots]
+        latch.fill(False)
+        latch[slots] = held
+
+    def on_contact(self, kind, slots, bloop):
+        self.touching = len(slots)
+
+    def bite(self, bloop):
+        """Contact damage of the minions that touched Bloop this tick; the boss
+        deals it after its own defeat check, as the minions used to update
+        after it."""
+        for _ in range(self.touching):
+            bloop.take_damage(CONTACT_DAMAGE)
+        self.touching = 0
+
+    # === Disegno ===
+    def interpolate(self, alpha):
+        self.alpha = alpha
+
+    def render(self, queue):
+        live = np.flatnonzero(self.alive[:self.top])
+        if not len(live):
+            return
+        prev_x = self.prev_x[live]
+        x = prev_x + (self.x[live] - prev_x) * self.alpha
+        images = (self.image_left, self.image_right)
+        queue.extend(render.CHARACTERS, [(images[right], pos) for right, pos in
+                     zip(self.facing_right[live].tolist(), zip(x.tolist(), self.y[live].tolist()))])
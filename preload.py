@@ -0,0 +1,71 @@
+import threading
+import time
+
+# === Precaricamento in background ===
+# While the menu sits idle, a worker thread runs load(key) for the levels
+# the player is likely to pick: the highlighted one first, then its
+# neighbours. load() decodes and converts a level's sprites into the shared
+# asset caches (assets.py is thread-safe), so when the level starts its
+# entities find everything already cached. wait(key) blocks only on what is
+# still outstanding for that level, and loads it on the calling thread if
+# the worker never got to it.
+class Preloader:
+    def __init__(self, load):
+        self.load = load
+        self.pending = []  # keys still to load, most wanted first
+        self.loads = {}  # key -> threading.Event, set when its load ends
+        self.failed = set()  # keys whose background load raised
+        self.seconds = {}  # key -> time its load took
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._work, name="preload", daemon=True)
+        self.thread.start()
+
+    def request(self, keys):
+        """Replaces the queue with keys, most wanted first; loaded ones are skipped."""
+        with self.condition:
+            self.pending = [key for key in keys if key not in self.loads]
+            self.condition.notify()
+
+    def _claim(self, key):
+        """Marks key as being loaded by the caller; False if it already is (or was)."""
+        if key in self.loads:
+            return False
+        self.loads[key] = threading.Event()
+        if key in self.pending:
+            self.pending.remove(key)
+        return True
+
+    def _run(self, key):
+        start = time.perf_counter()
+        try:
+            self.load(key)
+        except Exception:
+            self.failed.add(key)
+        finally:
+            self.seconds[key] = time.perf_counter() - start
+            self.loads[key].set()
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                key = self.pending.pop(0)
+                if not self._claim(key):
+                    continue  # wait() or an earlier pass already has it
+            self._run(key)
+
+    def wait(self, key):
+        """Blocks until key is loaded; returns the seconds spent waiting."""
+        start = time.perf_counter()
+        with self.condition:
+            mine = self._claim(key)
+        if mine:
+            self._run(key)
+        else:
+            self.loads[key].wait()
+        if key in self.failed:
+            # Let the level hit the error itself, on this thread
+            self.failed.discard(key)
+            self.load(key)
+        return time.perf_counter() - start
@@ -0,0 +1,124 @@
+import time
+from collections import deque
+import pygame
+import render
+
+# === Profiler dei frame ===
+# The level loop times every subsystem of a frame (input, Bloop.update, the
+# boss update under the ability it is running, collisions, each entity's
+# render, the blits and the flip) and hands the times to a FrameProfiler.
+# F3 toggles an overlay with the rolling mean and worst time of each
+# section over the last HISTORY samples and a graph of the last HISTORY
+# frame times against the 60 Hz budget. The overlay is one surface,
+# rebuilt a few times a second and drawn through the render queue's HUD
+# layer, so it also shows up in dirty-rect mode. Below the times it lists
+# the gauges last set by the level loop (telemetry.Telemetry: live entities
+# per container, animation and cache memory, heap growth). With a
+# tracing.Tracer attached every section is also recorded as a span for the
+# trace file.
+TOGGLE_KEY = pygame.K_F3
+HISTORY = 120  # samples kept per section, and frames in the graph
+REFRESH_FRAMES = 15  # overlay rebuilt every this many frames
+BUDGET_MS = 1000 / 60
+SLOW_MS = BUDGET_MS * 1.5  # red bar: at least one vsync missed, not tick jitter
+OVERLAY_POS = (510, 20)
+OVERLAY_WIDTH = 280
+LINE_HEIGHT = 14
+GRAPH_HEIGHT = 60
+GRAPH_SCALE = GRAPH_HEIGHT / (2 * BUDGET_MS)  # px per ms, two budgets fill the graph
+PANEL = (0, 0, 0, 170)
+TEXT = (255, 255, 255)
+SLOW = (255, 80, 80)
+FAST = (80, 220, 80)
+
+
+def ability(boss):
+    """What the boss's update is doing this tick, for the per-ability breakdown."""
+    if getattr(boss, "transformation_active", False):
+        return "transform"
+    return getattr(boss, "current_ability", None) or "idle"
+
+
+class FrameProfiler:
+    def __init__(self, history=HISTORY, tracer=None):
+        self.history = history
+        self.tracer = tracer
+        self.sections = {}  # name -> deque of ms, one entry per timed call
+        self.frames = deque(maxlen=history)  # ms between consecutive end_frame() calls
+        self.frame_start = None
+        self.boss_sections = {}  # (boss class, ability) -> section name
+        self.gauges = {}  # name -> latest value, listed under the times
+        self.visible = False
+        self.overlay = None
+        self.countdown = 0  # frames until the overlay is rebuilt
+        self.font = None
+
+    def add(self, name, start, end):
+        """Records a section that ran from start to end (time.perf_counter())."""
+        samples = self.sections.get(name)
+        if samples is None:
+            samples = self.sections[name] = deque(maxlen=self.history)
+        samples.append((end - start) * 1000)
+        if self.tracer is not None:
+            self.tracer.complete(name, start, end)
+
+    def boss_section(self, boss):
+        key = (type(boss), ability(boss))
+        name = self.boss_sections.get(key)
+        if name is None:
+            name = self.boss_sections[key] = f"{key[0].__name__}.update[{key[1]}]"
+        return name
+
+    def end_frame(self):
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.frames.append((now - self.frame_start) * 1000)
+            if self.tracer is not None:
+                self.tracer.complete("frame", self.frame_start, now)
+        self.frame_start = now
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.countdown = 0
+
+    def summary(self):
+        """section -> (mean ms, worst ms) over the rolling window."""
+        return {name: (sum(samples) / len(samples), max(samples))
+                for name, samples in self.sections.items() if samples}
+
+    def render(self, queue):
+        if not self.visible:
+            return
+        if self.countdown <= 0:
+            self.overlay = self.draw_overlay()
+            self.countdown = REFRESH_FRAMES
+        self.countdown -= 1
+        queue.add(render.HUD, self.overlay, OVERLAY_POS)
+
+    def draw_overlay(self):
+        if self.font is None:
+            self.font = pygame.font.SysFont(None, 16)
+        rows = [("ms", "mean", "worst"),
+                ("frame", f"{sum(self.frames) / max(len(self.frames), 1):.2f}", f"{max(self.frames, default=0):.2f}")]
+        rows += [(name, f"{mean:.2f}", f"{worst:.2f}") for name, (mean, worst) in self.summary().items()]
+        rows += [(name, "", str(value)) for name, value in self.gauges.items()]
+        height = 8 + LINE_HEIGHT * len(rows) + GRAPH_HEIGHT + 8
+        surface = pygame.Surface((OVERLAY_WIDTH, height), pygame.SRCALPHA)
+        surface.fill(PANEL)
+        y = 4
+        for name, mean, worst in rows:
+            surface.blit(self.font.render(name, True, TEXT), (6, y))
+            for text, right in ((mean, OVERLAY_WIDTH - 52), (worst, OVERLAY_WIDTH - 6)):
+                image = self.font.render(text, True, TEXT)
+                surface.blit(image, (right - image.get_width(), y))
+            y += LINE_HEIGHT
+        # Grafico: una barra per frame, la linea bianca è il budget di 60 Hz
+        bottom = height - 4
+        x = OVERLAY_WIDTH - 6 - 2 * len(self.frames)
+        for ms in self.frames:
+            bar = min(int(ms * GRAPH_SCALE), GRAPH_HEIGHT)
+            surface.fill(SLOW if ms > SLOW_MS else FAST, (x, bottom - bar, 2, bar))
+            x += 2
+        budget_y = bottom - int(BUDGET_MS * GRAPH_SCALE)
+        surface.fill(TEXT, (6, budget_y, OVERLAY_WIDTH - 12, 1))
+        return surface
@@ -0,0 +1,82 @@
+from array import array
+import pygame
+
+# === Pool dei proiettili di Bloop ===
+# Fixed-capacity struct-of-arrays store: one array per field, a free list of
+# unused slots, and automatic retirement once a shot leaves the arena. Work
+# per tick is bounded by the live shots instead of every shot ever fired.
+# Each slot also owns its hitbox Rect, moved in place by rect(i).
+ARENA_WIDTH = 800
+SIZE = 64  # hitbox dei proiettili, come il vecchio pygame.Rect(x, y, 64, 64)
+CAPACITY = 64
+
+
+class ProjectilePool:
+    def __init__(self, capacity=CAPACITY, arena_width=ARENA_WIDTH):
+        self.capacity = capacity
+        self.arena_width = arena_width
+        self.x = array("d", bytes(8 * capacity))
+        self.y = array("d", bytes(8 * capacity))
+        self.prev_x = array("d", bytes(8 * capacity))
+        self.vel = array("d", bytes(8 * capacity))
+        self.damage = array("i", bytes(4 * capacity))
+        self.active = bytearray(capacity)
+        self.rects = [pygame.Rect(0, 0, SIZE, SIZE) for _ in range(capacity)]
+        self.free = list(range(capacity - 1, -1, -1))  # pop() hands out slot 0 first
+        self.live = []  # indices of active slots, in spawn order
+        self.alpha = 1.0  # interpolation factor used by render()
+
+    def __len__(self):
+        return len(self.live)
+
+    def spawn(self, x, y, vel, damage):
+        """Fires a shot; returns its slot, or -1 when the pool is full."""
+        if not self.free:
+            return -1
+        i = self.free.pop()
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = y
+        self.vel[i] = vel
+        self.damage[i] = damage
+        self.active[i] = 1
+        self.live.append(i)
+        return i
+
+    def retire(self, i):
+        if self.active[i]:
+            self.active[i] = 0
+            self.live.remove(i)
+            self.free.append(i)
+
+    def rect(self, i):
+        """Hitbox of slot i at its current position."""
+        rect = self.rects[i]
+        rect.update(self.x[i], self.y[i], SIZE, SIZE)
+        return rect
+
+    def update(self):
+        x, prev_x, vel = self.x, self.prev_x, self.vel
+        left, right = -SIZE, self.arena_width
+        gone = None
+        for i in self.live:
+            prev_x[i] = x[i]
+            x[i] += vel[i]
+            if x[i] <= left or x[i] >= right:
+                if gone is None:
+                    gone = []
+                gone.append(i)
+        if gone:
+            for i in gone:
+                self.retire(i)
+
+    def interpolate(self, alpha):
+        self.alpha = alpha
+
+    def render(self, queue, layer, image):
+        alpha = self.alpha
+        x, prev_x, y = self.x, self.prev_x, self.y
+        queue.extend(layer, [(image, (prev_x[i] + (x[i] - prev_x[i]) * alpha, y[i])) for i in self.live])
+
+    def clear(self):
+        for i in list(self.live):
+            self.retire(i)
@@ -1,18 +1,35 @@
 import pygame
 import random
-import os
+import assets
+import simclock
+import collision
+import render
+import hud
+import animation
+from animation import LEFT, RIGHT
+from hazards import HazardField
 
 # Assuming SirBlub.py exists in the same directory for spawning
 from sirBlub import SirBlub
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600 # Consistent with main.py for projectile bounds
+SLIME_BALL_SIZE = (32, 32)
+PHASE_1_ABILITIES = ("melee", "teleport", "slime_combo")
+PHASE_2_ABILITIES = PHASE_1_ABILITIES + ("spawn",) # 'spawn' only until Sir Blub has been summoned
+# Animazioni per direzione e stato, come id interi calcolati una volta sola
+STATES = ("idle", "teleport_charge", "slime_combo_charge")
+IDLE, TELEPORT_CHARGE, SLIME_COMBO_CHARGE = range(len(STATES))
+ANIMATIONS = animation.table(len(STATES))  # direction -> state -> animation id
+TRANSFORM = 2 * len(STATES)  # undirected
+ANIMATION_NAMES = animation.names(STATES, ("transform",))
 
 
 # --- Helper Classes for ReGlobulus's Abilities ---
 
 class FireLine:
     """Manages a single line of fire left by ReGlobulus's teleport."""
+    __slots__ = ("x", "y", "width", "height", "start_time", "duration", "damage", "rect")
     def __init__(self, x, y, start_time, duration, width, height, damage):
         self.x = x
         self.y = y
@@ -30,53 +47,32 @@ class FireLine:
     def get_rect(self):
         return self.rect
 
-    def draw(self, screen):
-        # Draw a simple orange/red rectangle for the fire line
+    def render(self, queue):
+        # A simple orange rectangle with a red border for the fire line
         # In a real game, this would be an animation
-        pygame.draw.rect(screen, (255, 165, 0), self.rect) # Orange
-        # Optional: Add a subtle red outline or flicker effect
-        pygame.draw.rect(screen, (255, 0, 0), self.rect, 2) # Red border
-
-
-class SlimeBall:
-    """Manages a single slime ball projectile for the slime_combo ability."""
-    def __init__(self, x, y, image, damage, target_ground_y):
-        self.x = x
-        self.y = y
-        self.image = pygame.transform.scale(image, (32, 32)) # Slime balls are 32x32
-        self.damage = damage
-        self.vel_y = 0
-        self.gravity = 0.5 # Slime balls fall with gravity
-        self.active = True
-        self.rect = self.image.get_rect(topleft=(self.x, self.y))
-        self.target_ground_y = target_ground_y # The Y position where it stops falling
-
-    def update(self):
-        if not self.active:
-            return
-
-        self.vel_y += self.gravity
-        self.y += self.vel_y
-        self.rect.topleft = (self.x, self.y)
-
-        # Deactivate if it hits the ground or goes off screen
-        if self.y >= self.target_ground_y:
-            self.y = self.target_ground_y
-            self.vel_y = 0
-            self.active = False # Slime ball "splats" on the ground and becomes inactive
-
-    def get_rect(self):
-        return self.rect
-
-    def draw(self, screen):
-        if self.active:
-            screen.blit(self.image, self.rect)
+        render.fill_rect(queue, render.FLOOR, self.rect, (255, 165, 0), 2, (255, 0, 0))
 
 
 # --- ReGlobulus Class ---
 
 class ReGlobulus:
-    def __init__(self, x, y):
+    __slots__ = (
+        "clock", "rng", "x", "y", "width", "height", "initial_max_hp", "max_hp", "current_hp",
+        "hp_bar", "attack_cooldown", "last_attack_time", "attacking", "frame_index",
+        "frame_timer", "frame_speed", "melee_hit_registered", "direction",
+        "current_animation", "rect", "ability_cooldown", "last_ability_time", "current_ability",
+        "phase", "damage_multiplier", "transformation_active", "transforming", "transformation_start_time",
+        "transformation_duration", "spawn_sir_blub_used", "spawned_sir_blub", "teleport_charging",
+        "teleport_active", "teleport_charge_start_time", "teleport_charge_time",
+        "teleport_target_x", "fire_lines", "fire_line_duration", "fire_line_damage",
+        "slime_combo_charging", "slime_combo_active", "slime_combo_charge_start_time",
+        "slime_combo_charge_time", "slime_balls", "slime_ball_count", "slime_ball_spawn_delay",
+        "last_slime_ball_spawn_time", "slime_balls_launched_count", "animations", "frames", "image",
+    )
+
+    def __init__(self, x, y, clock=None, rng=None):
+        self.clock = clock if clock is not None else simclock.real  # timers in ms
+        self.rng = rng if rng is not None else random  # random.Random per fight for replays
         self.x = x
         self.y = y
         self.width = 64
@@ -85,9 +81,10 @@ class ReGlobulus:
         self.initial_max_hp = 200
         self.max_hp = self.initial_max_hp
         self.current_hp = self.initial_max_hp
+        self.hp_bar = hud.Bar((self.width, 5), (0, 100, 255))
 
         self.attack_cooldown = 1000 # General cooldown for melee/ability selection
-        self.last_attack_time = 0
+        self.last_attack_time = -self.attack_cooldown # Ready on the first tick of the fight
         self.attacking = False # For melee visual feedback
 
         self.frame_index = 0
@@ -95,17 +92,19 @@ class ReGlobulus:
         self.frame_speed = 10 # Default animation speed
         self.melee_hit_registered = False # To prevent multiple melee hits per single attack
 
-        self.direction = "right"
-        self.current_animation = "idle_right"
+        self.direction = RIGHT
+        self.current_animation = ANIMATIONS[RIGHT][IDLE]
+        self.rect = pygame.Rect(x, y, self.width, self.height) # Updated in place by get_rect()
 
         self.ability_cooldown = 2000 # Cooldown between choosing new abilities
-        self.last_ability_time = 0
+        self.last_ability_time = -self.ability_cooldown
         self.current_ability = None # Stores the currently active ability (e.g., "teleport", "slime_combo", "melee", "spawn")
 
         # --- Phase and Transformation Variables ---
         self.phase = 1 # Boss starts in Phase 1
         self.damage_multiplier = 1.0 # Multiplier for outgoing damage
         self.transformation_active = False # Flag for transformation sequence
+        self.transforming = False # This tick went to the transformation, including the one it ends on
         self.transformation_start_time = 0
         self.transformation_duration = 1500 # Duration of transformation animation in ms (adjust based on actual animation)
         self.spawn_sir_blub_used = False # Flag to ensure 'spawn Sir Blub' ability is used only once
@@ -126,85 +125,77 @@ class ReGlobulus:
         self.slime_combo_active = False
         self.slime_combo_charge_start_time = 0
         self.slime_combo_charge_time = 1000 # Time to charge before launching slime balls
-        self.slime_balls = [] # List of active SlimeBall objects
+        # Slime balls in the air; they splat once they reach the ground
+        self.slime_balls = HazardField(SLIME_BALL_SIZE, 0.5, SCREEN_HEIGHT - SLIME_BALL_SIZE[1], round_y=True)
         self.slime_ball_count = 8 # Number of slime balls to launch
         self.slime_ball_spawn_delay = 100 # Delay between individual slime ball launches
         self.last_slime_ball_spawn_time = 0
         self.slime_balls_launched_count = 0 # How many slime balls have been launched this combo
 
         self.animations = self.load_animations()
-        self.image = self.animations[self.current_animation][self.frame_index]
+        self.frames = animation.frames(self.animations, ANIMATION_NAMES)
+        self.image = self.frames[self.current_animation][self.frame_index]
 
     def load_animations(self):
         animations = {}
         target_size = (64, 64)
 
         # Idle (5 frames)
-        for direction in ["left", "right"]:
-            path = f"images/globulus/idle_{direction}"
+        for direction in animation.DIRECTIONS:
             frames = []
             for i in range(5):
-                file = f"frame_{i}.png"
-                full_path = os.path.join(path, file)
-                if os.path.exists(full_path):
-                    image = pygame.image.load(full_path).convert_alpha()
-                    frames.append(pygame.transform.scale(image, target_size))
+                name = f"globulus/idle_{direction}/frame_{i}"
+                if assets.cache.exists(name):
+                    frames.append(assets.scaled(name, target_size))
                 else:
-                    print(f"Warning: Missing idle animation frame: {full_path}")
+                    print(f"Warning: Missing idle animation frame: {assets.cache.path(name)}")
             animations[f"idle_{direction}"] = frames
         
         # Teleport (charge and active)
-        for direction in ["left", "right"]:
-            path = f"images/globulus/teleport_{direction}"
+        for direction in animation.DIRECTIONS:
             # frame_1: charging
-            charge_img = pygame.image.load(os.path.join(path, "frame_1.png")).convert_alpha()
-            charge_img = pygame.transform.scale(charge_img, target_size)
+            charge_img = assets.scaled(f"globulus/teleport_{direction}/frame_1", target_size)
             animations[f"teleport_charge_{direction}"] = [charge_img]
             # frame_2: after teleport (can be same as idle for visual continuity if no specific active frame)
-            active_img = pygame.image.load(os.path.join(path, "frame_2.png")).convert_alpha()
-            active_img = pygame.transform.scale(active_img, target_size)
+            active_img = assets.scaled(f"globulus/teleport_{direction}/frame_2", target_size)
             animations[f"teleport_active_{direction}"] = [active_img]
 
         # Slime Combo (charge)
-        for direction in ["left", "right"]:
-            path = f"images/globulus/slime_combo_{direction}"
-            charge_img = pygame.image.load(os.path.join(path, "frame_1.png")).convert_alpha()
-            charge_img = pygame.transform.scale(charge_img, target_size)
+        for direction in animation.DIRECTIONS:
+            charge_img = assets.scaled(f"globulus/slime_combo_{direction}/frame_1", target_size)
             animations[f"slime_combo_charge_{direction}"] = [charge_img]
         
         # Slime Ball Projectile
-        slime_ball_img = pygame.image.load("images/globulus/attacks/slime_ball.png").convert_alpha()
+        slime_ball_img = assets.scaled("globulus/attacks/slime_ball", SLIME_BALL_SIZE)
         animations["slime_ball_projectile"] = [slime_ball_img] # Stored as a list for consistency
 
         # Transformation Animation (assuming multiple frames)
-        transform_path = "images/globulus/transform"
         transform_frames = []
         # Assuming 5 frames for transformation (adjust range as needed)
         for i in range(5): 
-            file = f"frame_{i}.png"
-            full_path = os.path.join(transform_path, file)
-            if os.path.exists(full_path):
-                image = pygame.image.load(full_path).convert_alpha()
-                transform_frames.append(pygame.transform.scale(image, target_size))
+            name = f"globulus/transform/frame_{i}"
+            if assets.cache.exists(name):
+                transform_frames.append(assets.scaled(name, target_size))
             else:
-                print(f"Warning: Missing transform animation frame: {full_path}")
+                print(f"Warning: Missing transform animation frame: {assets.cache.path(name)}")
         animations["transform"] = transform_frames
 
         return animations
 
     def update(self, bloop):
-        current_time = pygame.time.get_ticks()
-        self.direction = "left" if bloop.x < self.x else "right"
+        current_time = self.clock.now()
+        self.direction = LEFT if bloop.x < self.x else RIGHT
 
         # --- Handle Transformation (Highest Priority State) ---
+        self.transforming = self.transformation_active
         if self.transformation_active:
-            self.current_animation = "transform"
+            self.current_animation = TRANSFORM
             # Update transformation animation
             self.frame_timer += 1
             if self.frame_timer >= self.frame_speed:
                 self.frame_timer = 0
-                self.frame_index = (self.frame_index + 1) % len(self.animations["transform"])
-            self.image = pygame.transform.scale(self.animations[self.current_animation][self.frame_index], (self.width, self.height))
+                self.frame_index = (self.frame_index + 1) % len(self.frames[TRANSFORM])
+            self.image = self.frames[self.current_animation][self.frame_index]
 
             if current_time - self.transformation_start_time >= self.transformation_duration:
                 # Transformation ends, enter Phase 2
@@ -221,8 +212,8 @@ class ReGlobulus:
 
         # --- Handle Active Abilities ---
         elif self.teleport_charging:
-            self.current_animation = f"teleport_charge_{self.direction}"
-            self.image = self.animations[self.current_animation][0]
+            self.current_animation = ANIMATIONS[self.direction][TELEPORT_CHARGE]
+            self.image = self.frames[self.current_animation][0]
             if current_time - self.teleport_charge_start_time >= self.teleport_charge_time:
                 # Teleport!
                 self.teleport_charging = False
@@ -240,8 +231,8 @@ class ReGlobulus:
                 self.frame_index = 0 # Reset animation for next state
 
         elif self.slime_combo_charging:
-            self.current_animation = f"slime_combo_charge_{self.direction}"
-            self.image = self.animations[self.current_animation][0]
+            self.current_animation = ANIMATIONS[self.direction][SLIME_COMBO_CHARGE]
+            self.image = self.frames[self.current_animation][0]
             if current_time - self.slime_combo_charge_start_time >= self.slime_combo_charge_time:
                 self.slime_combo_charging = False
                 self.slime_combo_active = True
@@ -250,31 +241,25 @@ class ReGlobulus:
 
         elif self.slime_combo_active:
             # ReGlobulus stays in idle animation during slime_combo
-            self.current_animation = f"idle_{self.direction}"
+            self.current_animation = ANIMATIONS[self.direction][IDLE]
             self.update_animation() # Keep animating idle
 
             # Spawn slime balls
             if self.slime_balls_launched_count < self.slime_ball_count and \
                current_time - self.last_slime_ball_spawn_time >= self.slime_ball_spawn_delay:
-                
-                s_ball = SlimeBall(random.randint(0, SCREEN_WIDTH - 32), # Random X from sky
-                                   -32, # Start above screen
-                                   self.animations["slime_ball_projectile"][0], # Slime ball image
-                                   int(10 * self.damage_multiplier), # Damage for slime ball
-                                   SCREEN_HEIGHT - 32) # Ground Y for slime balls (assuming Bloop's ground_y roughly)
-                self.slime_balls.append(s_ball)
+                self.slime_balls.spawn(self.rng.randint(0, SCREEN_WIDTH - 32), # Random X from sky
+                                       -32, # Start above screen
+                                       0,
+                                       int(10 * self.damage_multiplier)) # Damage for slime ball
                 self.last_slime_ball_spawn_time = current_time
                 self.slime_balls_launched_count += 1
             
-            # Update and check collisions for slime balls
-            for s_ball in self.slime_balls:
-                s_ball.update()
-                if s_ball.active and s_ball.get_rect().colliderect(bloop.get_rect()):
-                    bloop.take_damage(s_ball.damage)
-                    s_ball.active = False
-            
-            # Remove inactive slime balls
-            self.slime_balls = [s for s in self.slime_balls if s.active]
+            # Fall all slime balls at once; hits on Bloop land right away,
+            # so the end check below sees them
+            self.slime_balls.update()
+            for slot in self.slime_balls.hits(bloop.get_rect()):
+                bloop.take_damage(int(self.slime_balls.damage[slot]))
+                self.slime_balls.retire(slot)
 
             # End slime combo if all spawned and all active ones are gone
             if self.slime_balls_launched_count >= self.slime_ball_count and not self.slime_balls:
@@ -285,16 +270,16 @@ class ReGlobulus:
         # Melee Attack
         elif self.current_ability == "melee":
             # ReGlobulus stays in idle animation
-            self.current_animation = f"idle_{self.direction}"
+            self.current_animation = ANIMATIONS[self.direction][IDLE]
             self.update_animation() # Keep animating idle
 
             if self.get_rect().colliderect(bloop.get_rect()):
                 if current_time - self.last_attack_time >= self.attack_cooldown:
                     bloop.take_damage(int(5 * self.damage_multiplier)) # Apply damage multiplier
-                    
+
                     # Push Bloop
                     push_amount = 20 # How far to push Bloop
-                    bloop_push_direction = 1 if self.direction == "right" else -1
+                    bloop_push_direction = 1 if self.direction == RIGHT else -1
                     bloop.x += push_amount * bloop_push_direction
                     bloop.x = max(0, min(bloop.x, SCREEN_WIDTH - 64)) # Clamp Bloop to screen
 
@@ -311,12 +296,12 @@ class ReGlobulus:
 
         # Spawn Sir Blub (Phase 2 only, one time use)
         elif self.current_ability == "spawn" and self.phase == 2:
-            self.current_animation = f"idle_{self.direction}" # ReGlobulus stays in idle animation
+            self.current_animation = ANIMATIONS[self.direction][IDLE] # ReGlobulus stays in idle animation
             self.update_animation() # Keep animating idle
 
             if not self.spawn_sir_blub_used:
                 # Spawn SirBlub roughly near ReGlobulus
-                self.spawned_sir_blub = SirBlub(self.x + random.randint(-50, 50), self.y)
+                self.spawned_sir_blub = SirBlub(self.x + self.rng.randint(-50, 50), self.y, self.clock, self.rng)
                 self.spawned_sir_blub.current_hp = 200
                 self.spawn_sir_blub_used = True
                 self.current_ability = None # Ability used, reset
@@ -328,13 +313,10 @@ class ReGlobulus:
                 self.last_ability_time = current_time
                 
                 # Choose abilities based on phase
-                if self.phase == 1:
-                    self.current_ability = random.choice(["melee", "teleport", "slime_combo"])
-                else: # Phase 2
-                    available_abilities = ["melee", "teleport", "slime_combo"]
-                    if not self.spawn_sir_blub_used:
-                        available_abilities.append("spawn") # Add spawn only if not used
-                    self.current_ability = random.choice(available_abilities)
+                if self.phase == 1 or self.spawn_sir_blub_used:
+                    self.current_ability = self.rng.choice(PHASE_1_ABILITIES)
+                else: # Phase 2, Sir Blub not summoned yet
+                    self.current_ability = self.rng.choice(PHASE_2_ABILITIES)
                 
                 # Initialize variables for the chosen ability
                 if self.current_ability == "teleport":
@@ -353,34 +335,36 @@ class ReGlobulus:
                 
             # Update idle animation if truly idling (not in an ability state)
             if self.current_ability is None: # Only update idle if not preparing/doing an ability
-                self.current_animation = f"idle_{self.direction}"
+                self.current_animation = ANIMATIONS[self.direction][IDLE]
                 self.update_animation()
 
 
-        # --- Handle Damage from Bloop ---
-        # This section is independent of ReGlobulus's abilities
-        if bloop.melee_active and self.get_rect().colliderect(bloop.get_melee_rect()):
-            if not self.melee_hit_registered:
-                self.take_damage(4) # Damage from Bloop's melee
-                self.melee_hit_registered = True
-        else:
-            self.melee_hit_registered = False
+        # --- Update Fire Lines ---
+        # The list is only rebuilt on the tick a line burns out
+        for fl in self.fire_lines:
+            if not fl.update(current_time):
+                self.fire_lines = [fl for fl in self.fire_lines if fl.update(current_time)]
+                break
 
-        for p in bloop.projectiles:
-            if p["active"]:
-                proj_rect = pygame.Rect(p["x"], p["y"], 64, 64)
-                if self.get_rect().colliderect(proj_rect):
-                    self.take_damage(p["damage"])
-                    p["active"] = False
 
-        # --- Update Fire Lines ---
-        self.fire_lines = [fl for fl in self.fire_lines if fl.update(current_time)]
-        # Check collision with Bloop for active fire lines
+    # --- Collisions ---
+    # ReGlobulus's hurtbox and its fire lines; nothing registers while the
+    # transformation pauses the fight
+    def register_colliders(self, stage):
+        if self.transforming:
+            return
+        stage.add_hurtbox(self.get_rect(), self, collision.ENEMY)
         for fl in self.fire_lines:
-            if fl.get_rect().colliderect(bloop.get_rect()):
-                bloop.take_damage(fl.damage) # Fire line damage
+            stage.add_hitbox(fl.get_rect(), self, "fire_line", collision.ENEMY, fl)
 
+    def on_contact(self, kind, data, bloop):
+        if kind == "fire_line":
+            bloop.take_damage(data.damage) # Fire line damage
 
+    def after_contacts(self, bloop):
+        if self.transforming:
+            return
+        current_time = self.clock.now()
         # --- Check for Phase Transition / Defeat ---
         if self.current_hp <= 0:
             if self.phase == 1 and not self.transformation_active:
@@ -396,48 +380,48 @@ class ReGlobulus:
                 # Fully defeated in Phase 2
                 raise Exception("ReGlobulus is defeated!")
 
-        # --- Update Spawned SirBlub ---
-        if self.spawned_sir_blub:
-            self.spawned_sir_blub.update(bloop)
-
+    def summoned(self):
+        """The Sir Blub summoned in phase 2 when he acts this tick, else None.
+        The level loop updates him and gives him a collision pass of his own
+        right after ReGlobulus's, so a beaten ReGlobulus ends the fight first."""
+        if self.transforming:
+            return None
+        return self.spawned_sir_blub
 
     def update_animation(self):
         # Generic animation update logic for states like idle and sprint
         self.frame_timer += 1
         if self.frame_timer >= self.frame_speed:
             self.frame_timer = 0
-            frames = self.animations[self.current_animation]
+            frames = self.frames[self.current_animation]
             self.frame_index = (self.frame_index + 1) % len(frames)
-            self.image = pygame.transform.scale(frames[self.frame_index], (self.width, self.height))
+            self.image = frames[self.frame_index] # frames are already width x height
 
     def take_damage(self, amount):
         self.current_hp = max(0, self.current_hp - amount)
 
     def get_rect(self):
         # Returns the current bounding box for ReGlobulus
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
 
-    def draw(self, screen):
+    def render(self, queue):
         # Draw ReGlobulus's current image
-        screen.blit(self.image, (self.x, self.y))
+        queue.add(render.CHARACTERS, self.image, (self.x, self.y))
         
         # Draw Fire Lines
         for fl in self.fire_lines:
-            fl.draw(screen)
+            fl.render(queue)
 
         # Draw Slime Balls
-        for s_ball in self.slime_balls:
-            s_ball.draw(screen)
+        self.slime_balls.render(queue, render.PROJECTILES, self.animations["slime_ball_projectile"][0])
 
         # Draw Spawned SirBlub
         if self.spawned_sir_blub:
-            self.spawned_sir_blub.draw(screen)
+            self.spawned_sir_blub.render(queue)
         
-        # Draw Health Bar
+        # Draw Health Bar, color changes based on phase
         hp_ratio = self.current_hp / self.max_hp
-        # Background of health bar
-        pygame.draw.rect(screen, (50, 50, 50), (self.x, self.y - 10, self.width, 5))
-        # Foreground (current HP) of health bar, color changes based on phase or just blue
         hp_color = (0, 100, 255) if self.phase == 1 else (255, 50, 0) # Blue for P1, Red for P2
-        pygame.draw.rect(screen, hp_color, (self.x, self.y - 10, self.width * hp_ratio, 5))
+        self.hp_bar.render(queue, (self.x, self.y - 10), hp_ratio, hp_color)
 
@@ -0,0 +1,109 @@
+import pygame
+from functools import lru_cache
+
+# === Coda di rendering ===
+# Entities no longer blit straight to the screen: render(queue) submits
+# (image, position[, area]) entries to a layer, and flush() draws each layer
+# with a single Surface.blits call, back to front. Rectangles (fire lines,
+# the laser) are pre-rendered once into cached surfaces and go through the
+# same blits; health bars and labels are hud.py widgets that redraw their
+# own surface only when their value changes. Positions are taken when an
+# entry is submitted, so interpolated positions can be undone before the
+# flush. DirtyRects, at the bottom, presents a frame without touching the
+# rest of the screen.
+FLOOR = 0  # on the ground, under everyone (fire lines)
+CHARACTERS = 1  # Bloop, bosses, minions
+PROJECTILES = 2  # shots, salsa drops, slime balls
+EFFECTS = 3  # melee swing, laser
+HUD = 4  # health bars, cooldown meters, labels
+LAYERS = 5
+SHAPE_CACHE = 256  # distinct pre-rendered rectangles kept around
+MAX_DIRTY_RECTS = 64  # oltre, un solo rettangolo che li contiene tutti
+
+
+class RenderQueue:
+    def __init__(self, layers=LAYERS):
+        self.layers = [[] for _ in range(layers)]
+        self.blits = 0  # entries drawn by the last flush()
+        self.calls = 0  # Surface.blits calls made by the last flush()
+
+    def add(self, layer, image, pos, area=None):
+        if area is None:
+            self.layers[layer].append((image, pos))
+        else:
+            self.layers[layer].append((image, pos, area))
+
+    def extend(self, layer, entries):
+        self.layers[layer].extend(entries)
+
+    def flush(self, surface, dirty=False):
+        """Draws and empties every layer; with dirty=True returns the rects drawn to."""
+        rects = [] if dirty else None
+        blits = calls = 0
+        for entries in self.layers:
+            if entries:
+                drawn = surface.blits(entries, dirty)
+                if dirty:
+                    rects.extend(drawn)
+                blits += len(entries)
+                calls += 1
+                entries.clear()
+        self.blits = blits
+        self.calls = calls
+        return rects
+
+    def clear(self):
+        for entries in self.layers:
+            entries.clear()
+
+
+@lru_cache(maxsize=SHAPE_CACHE)
+def solid(size, color, border=0, border_color=None):
+    """A filled rectangle surface, with an optional border, drawn once per
+    (size, color, border) and shared by everyone who asks for it."""
+    surface = pygame.Surface(size)
+    surface.fill(color)
+    if border:
+        pygame.draw.rect(surface, border_color, surface.get_rect(), border)
+    return surface
+
+
+def fill_rect(queue, layer, rect, color, border=0, border_color=None):
+    queue.add(layer, solid((rect[2], rect[3]), color, border, border_color), (rect[0], rect[1]))
+
+
+# === Rettangoli sporchi ===
+# Optional replacement for fill + flip: only the background under last
+# frame's sprites is restored, everything is drawn again, and only those
+# rects plus the ones drawn this frame are pushed with display.update(). Every
+# drawn element (sprites, bars, laser, fire lines) goes through the queue, so
+# the rects blits() returns are exactly what changed on screen.
+class DirtyRects:
+    def __init__(self, background):
+        self.background = background
+        self.previous = []  # rects drawn last frame
+        self.full = True  # fill and flip the whole screen on the next present()
+        self.updated = 0  # rects pushed by the last present(), 0 for a full flip
+
+    def invalidate(self):
+        """Repaints the whole screen next frame (first frame, window exposed)."""
+        self.full = True
+
+    def present(self, surface, queue):
+        if self.full:
+            surface.fill(self.background)
+            self.previous = queue.flush(surface, True)
+            pygame.display.flip()
+            self.full = False
+            self.updated = 0
+            return
+        background = self.background
+        for rect in self.previous:
+            surface.fill(background, rect)
+        current = queue.flush(surface, True)
+        dirty = self.previous + current
+        if len(dirty) > MAX_DIRTY_RECTS:
+            dirty = [dirty[0].unionall(dirty[1:])]
+        pygame.display.update(dirty)
+        self.previous = current
+        self.updated = len(dirty)
@@ -0,0 +1,142 @@
+import importlib
+import random
+import struct
+import sys
+
+from controls import KeyState, mask
+
+# === Replay delle partite ===
+# A replay is the fight's RNG seed plus one input bitmask (see controls.py)
+# per logic tick. With the boss drawing from random.Random(seed) and timers on
+# a VirtualClock, feeding the same masks back reproduces the fight exactly.
+#
+# File layout: header (magic, version, level, seed, ticks) followed by
+# run-length encoded (mask u8, count u16) pairs. VERSION goes up whenever the
+# fight rules change, so older recordings are refused instead of silently
+# playing back a different fight.
+MAGIC = b"SSRP"
+VERSION = 3  # 2: cooldowns ready on the first tick again; 3: same-tick boss contacts again
+HEADER = struct.Struct("<4sBBQI")
+RUN = struct.Struct("<BH")
+MAX_RUN = 0xFFFF
+LEVEL_MODULES = {1: "main", 2: "livello2", 3: "livello3"}
+
+
+def fight_seed(seed=None, replay=None):
+    """Seed for a new fight: the replay's, the one asked for, or a fresh one."""
+    if replay is not None:
+        return replay.seed
+    if seed is not None:
+        return seed
+    return random.randrange(2 ** 32)
+
+
+class Replay:
+    def __init__(self, level, seed, masks=None):
+        self.level = level
+        self.seed = seed
+        self.masks = bytearray(masks or b"")
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.level, self.seed, len(self.masks)))
+            i = 0
+            while i < len(self.masks):
+                value = self.masks[i]
+                count = 1
+                while i + count < len(self.masks) and self.masks[i + count] == value and count < MAX_RUN:
+                    count += 1
+                f.write(RUN.pack(value, count))
+                i += count
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, level, seed, ticks = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay")
+        masks = bytearray()
+        for value, count in RUN.iter_unpack(data[HEADER.size:]):
+            masks.extend(bytes([value]) * count)
+        if len(masks) != ticks:
+            raise ValueError(f"{path} is truncated: {len(masks)} of {ticks} ticks")
+        return cls(level, seed, masks)
+
+    def input(self):
+        return ReplayInput(self.masks)
+
+
+class ReplayInput:
+    """Input source that plays back recorded masks, then holds no keys."""
+    def __init__(self, masks):
+        self.masks = masks
+        self.tick = 0
+
+    def next(self):
+        value = self.masks[self.tick] if self.tick < len(self.masks) else 0
+        self.tick += 1
+        return KeyState(value)
+
+
+class Recorder:
+    """Collects the input of every logic tick; saved to path if one is given."""
+    def __init__(self, level, seed, path=None):
+        self.replay = Replay(level, seed)
+        self.path = path
+
+    def record(self, keys):
+        self.replay.masks.append(mask(keys))
+
+    def save(self, path=None):
+        self.replay.save(path or self.path)
+
+
+def play(path):
+    """Re-runs a replay headless and returns the fight result."""
+    import simulate
+    replay = Replay.load(path)
+    return simulate.run_fight(replay.level, replay.input(), max_ticks=len(replay.masks), seed=replay.seed)
+
+
+def watch(path):
+    """Re-runs a replay in the game window."""
+    replay = Replay.load(path)
+    level = importlib.import_module(LEVEL_MODULES[replay.level])
+    level.main_loop(replay=replay)
+
+
+def record(path, level, seed, max_ticks=None):
+    """Records a headless fight driven by simulate.RandomInput(seed)."""
+    import simulate
+    recorder = Recorder(level, seed, path)
+    result = simulate.run_fight(level, simulate.RandomInput(seed), max_ticks or simulate.MAX_TICKS,
+                                seed=seed, recorder=recorder)
+    recorder.save()
+    return result
+
+
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Record and play back deterministic fights")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rec = commands.add_parser("record", help="record a headless fight with random input")
+    rec.add_argument("path")
+    rec.add_argument("--level", type=int, choices=sorted(LEVEL_MODULES), default=1)
+    rec.add_argument("--seed", type=int, default=0)
+    rec.add_argument("--max-ticks", type=int)
+    play_cmd = commands.add_parser("play", help="re-run a replay and print the result")
+    play_cmd.add_argument("path")
+    play_cmd.add_argument("--watch", action="store_true", help="play back in the game window")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        print(record(args.path, args.level, args.seed, args.max_ticks))
+    elif args.watch:
+        watch(args.path)
+    else:
+        print(play(args.path))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,39 @@
+import pygame
+
+# === Orologio di simulazione ===
+# Every entity timer (cooldowns, charge times, durations) reads now() from a
+# clock handed to the entity instead of calling pygame.time.get_ticks(), so a
+# fight can run in real time, sped up, or stepped entirely by the caller.
+# All clocks count milliseconds.
+
+
+class RealClock:
+    """Wall-clock time, same as pygame.time.get_ticks()."""
+    def now(self):
+        return pygame.time.get_ticks()
+
+
+class ScaledClock:
+    """Wall-clock time running `scale` times faster (or slower) from creation."""
+    def __init__(self, scale, source=None):
+        self.scale = scale
+        self.source = source if source is not None else real
+        self.start = self.source.now()
+
+    def now(self):
+        return (self.source.now() - self.start) * self.scale
+
+
+class VirtualClock:
+    """Time that only moves when advance() is called, e.g. once per logic step."""
+    def __init__(self, start=0):
+        self.time = start
+
+    def advance(self, ms):
+        self.time += ms
+
+    def now(self):
+        return self.time
+
+
+real = RealClock()
@@ -0,0 +1,192 @@
+import os
+import sys
+import random
+import time
+import json
+
+# === Simulazione headless ===
+# Runs Bloop against a boss with no window, no blits and no frame cap, driven
+# by a scripted or random input source instead of pygame.key.get_pressed.
+# The dummy driver has to be selected before window.open() opens the
+# display that convert_alpha() needs.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # stdout is JSON
+
+import pygame
+import gameloop
+import window
+import collision
+import simclock
+from controls import CONTROLS, KeyState
+from bloop import Bloop
+from sirBlub import SirBlub
+from chefPlu2 import ChefPlu
+from reglobulus import ReGlobulus
+
+WIDTH, HEIGHT = 800, 600
+LEVELS = {
+    1: SirBlub,
+    2: ChefPlu,
+    3: ReGlobulus,
+}
+MAX_TICKS = 60 * 60 * 5  # 5 minuti di gioco a 60 FPS
+
+
+class RandomInput:
+    """Holds a random key combination for a random number of ticks, then picks another."""
+    def __init__(self, seed=None, min_hold=5, max_hold=30):
+        self.rng = random.Random(seed)
+        self.min_hold = min_hold
+        self.max_hold = max_hold
+        self.keys = KeyState()
+        self.remaining = 0
+
+    def next(self):
+        if self.remaining <= 0:
+            self.keys = KeyState(self.rng.getrandbits(len(CONTROLS)))
+            self.remaining = self.rng.randint(self.min_hold, self.max_hold)
+        self.remaining -= 1
+        return self.keys
+
+
+class ScriptedInput:
+    """Replays a looping list of (KeyState, ticks) steps.
+
+    parse() accepts the CLI form, e.g. "RIGHT+2:30,SPACE:1,LEFT+1:20".
+    """
+    def __init__(self, steps):
+        self.steps = steps
+        self.step = 0
+        self.remaining = steps[0][1]
+
+    @classmethod
+    def parse(cls, script):
+        steps = []
+        for part in script.split(","):
+            names, ticks = part.rsplit(":", 1)
+            keys = KeyState.from_names(n for n in names.split("+") if n and n != "NONE")
+            steps.append((keys, int(ticks)))
+        return cls(steps)
+
+    def next(self):
+        while self.remaining <= 0:
+            self.step = (self.step + 1) % len(self.steps)
+            self.remaining = self.steps[self.step][1]
+        self.remaining -= 1
+        return self.steps[self.step][0]
+
+
+def make_clock(kind="virtual", scale=10):
+    if kind == "virtual":
+        return simclock.VirtualClock()
+    if kind == "scaled":
+        return simclock.ScaledClock(scale)
+    return simclock.RealClock()
+
+
+def defeated(bloop, boss):
+    """True when the state matches one of the defeats the entities raise."""
+    if bloop.dead:
+        return bloop.die_y <= 200
+    if boss.current_hp <= 0 and getattr(boss, "phase", 2) == 2:  # ReGlobulus transforms in phase 1
+        return True
+    sir_blub = getattr(boss, "spawned_sir_blub", None)
+    return sir_blub is not None and sir_blub.current_hp <= 0
+
+
+def run_fight(level, input_source, max_ticks=MAX_TICKS, clock=None, seed=None, recorder=None):
+    """Runs one fight to the end (or max_ticks). Returns a result dict.
+
+    A VirtualClock (the default) is advanced by one logic step per tick, so
+    timers behave exactly as in the real game however fast the loop runs.
+    The boss draws from random.Random(seed); with a virtual clock the same
+    seed and inputs always replay the same fight.
+    """
+    window.open()  # i PNG si convertono solo con un display, qui il dummy
+    clock = clock if clock is not None else simclock.VirtualClock()
+    step = isinstance(clock, simclock.VirtualClock)
+    boss = LEVELS[level](400, HEIGHT - 64, clock, random.Random(seed))
+    bloop = Bloop(100, HEIGHT - 64, clock)
+    stage = collision.CollisionStage()
+    summon_stage = collision.CollisionStage()  # the summoned boss's own pass
+    winner = None
+    reason = "timeout"
+    tick = 0
+    while tick < max_ticks:
+        tick += 1
+        pygame.event.pump()
+        if step:
+            clock.advance(gameloop.STEP_MS)
+        keys = input_source.next()
+        if recorder is not None:
+            recorder.record(keys)
+        try:
+            bloop.update(keys)
+            boss.update(bloop)
+            stage.run(bloop, boss)
+            summon = boss.summoned()
+            if summon is not None:
+                summon.update(bloop)
+                summon_stage.run(bloop, summon)
+        except Exception as e:  # le sconfitte sono segnalate con eccezioni
+            if not defeated(bloop, boss):
+                raise  # a real bug, not the end of the fight
+            winner = "boss" if bloop.dead else "bloop"
+            reason = str(e)
+            break
+    return {
+        "level": level,
+        "seed": seed,
+        "winner": winner,
+        "reason": reason,
+        "ticks": tick,
+        "bloop_hp": bloop.current_hp,
+        "boss_hp": boss.current_hp,
+    }
+
+
+def run_batch(level, fights, seed=0, script=None, max_ticks=MAX_TICKS, clock="virtual", scale=10):
+    results = []
+    start = time.perf_counter()
+    for i in range(fights):
+        source = ScriptedInput.parse(script) if script else RandomInput(seed + i)
+        results.append(run_fight(level, source, max_ticks, make_clock(clock, scale), seed + i))
+    elapsed = time.perf_counter() - start
+    wins = sum(1 for r in results if r["winner"] == "bloop")
+    losses = sum(1 for r in results if r["winner"] == "boss")
+    return {
+        "level": level,
+        "fights": fights,
+        "bloop_wins": wins,
+        "boss_wins": losses,
+        "timeouts": fights - wins - losses,
+        "mean_ticks": sum(r["ticks"] for r in results) / max(fights, 1),
+        "seconds": elapsed,
+        "fights_per_minute": fights / elapsed * 60 if elapsed else 0,
+        "results": results,
+    }
+
+
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Headless, uncapped boss fight simulation")
+    parser.add_argument("--level", type=int, choices=sorted(LEVELS), default=1)
+    parser.add_argument("--fights", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--script", help='looping input script, e.g. "RIGHT+2:30,SPACE:1"')
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--clock", choices=["virtual", "scaled", "real"], default="virtual")
+    parser.add_argument("--scale", type=float, default=10, help="speed-up for --clock scaled")
+    parser.add_argument("--results", action="store_true", help="include every fight in the output")
+    args = parser.parse_args(argv)
+
+    window.open()
+    summary = run_batch(args.level, args.fights, args.seed, args.script, args.max_ticks, args.clock, args.scale)
+    if not args.results:
+        del summary["results"]
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,21 +1,47 @@
 import pygame
 import random
-from miniBlub import MiniBlub
+import assets
+import simclock
+import collision
+import render
+import hud
+import animation
+from animation import LEFT, RIGHT
+from miniBlub import MiniBlubSwarm
 
 SCREEN_WIDTH = 800
+ABILITIES = ("melee", "stoccata", "spawn")
+STATES = ("idle", "melee", "stoccata", "spawn")
+IDLE, MELEE, STOCCATA, SPAWN = range(len(STATES))
+ANIMATIONS = animation.table(len(STATES))  # direction -> state -> animation id
+ANIMATION_NAMES = animation.names(STATES)
 
 class SirBlub:
-    def __init__(self, x, y):
+    __slots__ = (
+        "clock", "rng", "x", "y", "width", "height", "max_hp", "hp_bar", "current_hp",
+        "attack_cooldown", "last_attack_time", "attacking", "frame_index", "frame_timer",
+        "frame_speed", "melee_hit_registered", "direction", "current_animation",
+        "rect", "stoccata_cooldown", "last_stoccata_time", "stoccata_active", "stoccata_charging",
+        "stoccata_charge_start", "stoccata_speed", "stoccata_direction", "stoccata_start_time",
+        "stoccata_duration", "ability_cooldown", "last_ability_time", "current_ability",
+        "spawn_frame_index", "spawn_frame_timer", "spawn_frame_speed", "spawning",
+        "spawn_start_time", "spawn_duration", "minions", "animations", "frames", "image",
+    )
+
+    def __init__(self, x, y, clock=None, rng=None):
+        self.clock = clock if clock is not None else simclock.real  # timers in ms
+        self.rng = rng if rng is not None else random  # random.Random per fight for replays
         self.x = x
         self.y = y
         self.width = 64
         self.height = 64
 
         self.max_hp = 400
+        self.hp_bar = hud.Bar((self.width, 5), (0, 100, 255))
         self.current_hp = 400
 
         self.attack_cooldown = 1000
-        self.last_attack_time = 0
+        self.last_attack_time = -self.attack_cooldown  # ready at the start of the fight
         self.attacking = False
 
         self.frame_index = 0
@@ -23,21 +49,22 @@ class SirBlub:
         self.frame_speed = 10
         self.melee_hit_registered = False
 
-        self.direction = "right"
-        self.current_animation = "idle_right"
+        self.direction = RIGHT
+        self.current_animation = ANIMATIONS[RIGHT][IDLE]
+        self.rect = pygame.Rect(x, y, self.width, self.height)  # moved in place by get_rect()
 
         self.stoccata_cooldown = 6000
-        self.last_stoccata_time = 0
+        self.last_stoccata_time = -self.stoccata_cooldown
         self.stoccata_active = False
         self.stoccata_charging = False
         self.stoccata_charge_start = 0
         self.stoccata_speed = 10
-        self.stoccata_direction = "right"
+        self.stoccata_direction = RIGHT
         self.stoccata_start_time = 0
         self.stoccata_duration = 3000
 
         self.ability_cooldown = 2000
-        self.last_ability_time = 0
+        self.last_ability_time = -self.ability_cooldown
         self.current_ability = None
 
         self.spawn_frame_index = 0
@@ -47,35 +74,35 @@ class SirBlub:
         self.spawn_start_time = 0
         self.spawn_duration = 2000
 
-        self.minions = []
+        self.minions = MiniBlubSwarm()
 
+        # Frames come pre-scaled from the shared derived cache, so the
+        # per-tick code below never calls pygame.transform
+        size = (self.width, self.height)
         self.animations = {
-            "idle_left": [pygame.image.load(f"images/blub/idle_left/frame_{i}.png").convert_alpha() for i in range(2)],
-            "idle_right": [pygame.image.load(f"images/blub/idle_right/frame_{i}.png").convert_alpha() for i in range(2)],
-            "melee_left": [pygame.image.load(f"images/blub/melee_left/frame_{i}.png").convert_alpha() for i in range(3)],
-            "melee_right": [pygame.image.load(f"images/blub/melee_right/frame_{i}.png").convert_alpha() for i in range(3)],
-            "stoccata_left": [None,
-                              pygame.image.load("images/blub/stoccata_left/frame_1.png").convert_alpha(),
-                              pygame.image.load("images/blub/stoccata_left/frame_2.png").convert_alpha()],
-            "stoccata_right": [None,
-                               pygame.image.load("images/blub/stoccata_right/frame_1.png").convert_alpha(),
-                               pygame.image.load("images/blub/stoccata_right/frame_2.png").convert_alpha()],
-            "spawn_left": [pygame.image.load(f"images/blub/spawn_left/frame_{i}.png").convert_alpha() for i in range(5)],
-            "spawn_right": [pygame.image.load(f"images/blub/spawn_right/frame_{i}.png").convert_alpha() for i in range(5)],
+            "idle_left": assets.scaled_frames("blub/idle_left", size, range(2)),
+            "idle_right": assets.scaled_frames("blub/idle_right", size, range(2)),
+            "melee_left": assets.scaled_frames("blub/melee_left", size, range(3)),
+            "melee_right": assets.scaled_frames("blub/melee_right", size, range(3)),
+            "stoccata_left": [None] + assets.scaled_frames("blub/stoccata_left", size, range(1, 3)),
+            "stoccata_right": [None] + assets.scaled_frames("blub/stoccata_right", size, range(1, 3)),
+            "spawn_left": assets.scaled_frames("blub/spawn_left", size, range(5)),
+            "spawn_right": assets.scaled_frames("blub/spawn_right", size, range(5)),
         }
+        self.frames = animation.frames(self.animations, ANIMATION_NAMES)
 
-        self.image = self.animations[self.current_animation][self.frame_index]
+        self.image = self.frames[self.current_animation][self.frame_index]
 
     def update(self, bloop):
-        current_time = pygame.time.get_ticks()
-        self.direction = "left" if bloop.x < self.x else "right"
+        current_time = self.clock.now()
+        self.direction = LEFT if bloop.x < self.x else RIGHT
 
         # --- Handle Active Abilities ---
         # Stoccata Charging
         if self.stoccata_charging:
             self.attacking = False
-            self.current_animation = f"stoccata_{self.stoccata_direction}"
-            self.image = pygame.transform.scale(self.animations[self.current_animation][1], (self.width, self.height))
+            self.current_animation = ANIMATIONS[self.stoccata_direction][STOCCATA]
+            self.image = self.frames[self.current_animation][1]
             if current_time - self.stoccata_charge_start >= 1000:
                 self.stoccata_charging = False
                 self.stoccata_active = True
@@ -88,9 +115,9 @@ class SirBlub:
                 self.current_ability = None
             else:
                 self.attacking = False
-                self.current_animation = f"stoccata_{self.stoccata_direction}"
-                self.image = pygame.transform.scale(self.animations[self.current_animation][2], (self.width, self.height))
-                direction = 1 if self.stoccata_direction == "right" else -1
+                self.current_animation = ANIMATIONS[self.stoccata_direction][STOCCATA]
+                self.image = self.frames[self.current_animation][2]
+                direction = 1 if self.stoccata_direction == RIGHT else -1
                 self.x += self.stoccata_speed * direction
                 self.x = max(0, min(self.x, SCREEN_WIDTH - self.width))
 
@@ -98,12 +125,12 @@ class SirBlub:
                     bloop.take_damage(15)
                     self.stoccata_active = False
                     self.current_ability = None
-        
+
         # Spawning Minions
         elif self.spawning:
             self.attacking = False
-            spawn_frames = self.animations[f"spawn_{self.direction}"]
-            self.current_animation = f"spawn_{self.direction}"
+            self.current_animation = ANIMATIONS[self.direction][SPAWN]
+            spawn_frames = self.frames[self.current_animation]
 
             self.spawn_frame_timer += 1
             if self.spawn_frame_timer >= self.spawn_frame_speed:
@@ -116,7 +143,7 @@ class SirBlub:
                     self.frame_index = 0
                     self.frame_timer = 0
                 else:
-                    self.image = pygame.transform.scale(spawn_frames[self.spawn_frame_index], (self.width, self.height))
+                    self.image = spawn_frames[self.spawn_frame_index]
 
         # Melee Attack
         elif self.current_ability == "melee":
@@ -140,7 +167,7 @@ class SirBlub:
         if self.current_ability is None:
             if current_time - self.last_ability_time >= self.ability_cooldown:
                 self.last_ability_time = current_time
-                self.current_ability = random.choice(["melee", "stoccata", "spawn"])
+                self.current_ability = self.rng.choice(ABILITIES)
                 
                 if self.current_ability == "stoccata":
                     self.stoccata_charging = True
@@ -152,18 +179,19 @@ class SirBlub:
                     self.spawning = True
                     self.spawn_frame_index = 0
                     self.spawn_frame_timer = 0
-                    self.image = pygame.transform.scale(self.animations[f"spawn_{self.direction}"][0], (self.width, self.height))
+                    self.image = self.frames[ANIMATIONS[self.direction][SPAWN]][0]
                     self.spawn_start_time = current_time
                 
             # Animation for idle/running
+            ids = ANIMATIONS[self.direction]
             if self.attacking:
-                self.current_animation = f"melee_{self.direction}"
+                self.current_animation = ids[MELEE]
             else:
-                self.current_animation = f"idle_{self.direction}"
+                self.current_animation = ids[IDLE]
             
             # The melee animation is brief, so we need to handle it.
-            if self.attacking and self.current_animation == f"melee_{self.direction}":
-                frames = self.animations[self.current_animation]
+            if self.attacking and self.current_animation == ids[MELEE]:
+                frames = self.frames[self.current_animation]
                 self.frame_timer += 1
                 if self.frame_timer >= self.frame_speed:
                     self.frame_timer = 0
@@ -171,56 +199,50 @@ class SirBlub:
                     if self.frame_index >= len(frames):
                         self.frame_index = 0
                         self.attacking = False
-                    self.image = pygame.transform.scale(frames[self.frame_index], (self.width, self.height))
+                    self.image = frames[self.frame_index]
             elif not self.spawning and not self.stoccata_active and not self.stoccata_charging:
                 self.update_animation()
 
 
-        # --- Handle Damage from Bloop ---
-        if bloop.melee_active and self.get_rect().colliderect(bloop.get_melee_rect()):
-            if not self.melee_hit_registered:
-                self.take_damage(4)
-                self.melee_hit_registered = True
-        else:
-            self.melee_hit_registered = False
+        # --- Update Minions ---
+        self.minions.update(bloop)
 
-        for p in bloop.projectiles:
-            if p["active"]:
-                proj_rect = pygame.Rect(p["x"], p["y"], 64, 64)
-                if self.get_rect().colliderect(proj_rect):
-                    self.take_damage(p["damage"])
-                    p["active"] = False
+    # === Collisioni ===
+    # Bloop's melee and shots land on the hurtbox registered here during the
+    # collision pass; the defeat check waits for them in after_contacts()
+    def register_colliders(self, stage):
+        stage.add_hurtbox(self.get_rect(), self, collision.ENEMY)
+        self.minions.register_colliders(stage)
 
+    def after_contacts(self, bloop):
         if self.current_hp <= 0:
             raise Exception("Sir Blub is defeated!")
+        self.minions.bite(bloop)
 
-        # --- Update Minions ---
-        for minion in self.minions:
-            minion.update(bloop)
+    def summoned(self):
+        return None  # Sir Blub summons minions, not bosses
 
     def spawn_minions(self):
-        for _ in range(random.randint(1, 3)):
-            m = MiniBlub(self.x + random.randint(-30, 30), self.y + 32)
-            self.minions.append(m)
+        for _ in range(self.rng.randint(1, 3)):
+            self.minions.spawn(self.x + self.rng.randint(-30, 30), self.y + 32)
 
     def update_animation(self):
         self.frame_timer += 1
         if self.frame_timer >= self.frame_speed:
             self.frame_timer = 0
-            frames = self.animations[self.current_animation]
+            frames = self.frames[self.current_animation]
             self.frame_index = (self.frame_index + 1) % len(frames)
-            self.image = pygame.transform.scale(frames[self.frame_index], (self.width, self.height))
+            self.image = frames[self.frame_index]
 
     def take_damage(self, amount):
         self.current_hp = max(0, self.current_hp - amount)
 
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
 
-    def draw(self, screen):
-        screen.blit(self.image, (self.x, self.y))
-        for minion in self.minions:
-            minion.draw(screen)
+    def render(self, queue):
+        queue.add(render.CHARACTERS, self.image, (self.x, self.y))
+        self.minions.render(queue)
         hp_ratio = self.current_hp / self.max_hp
-        pygame.draw.rect(screen, (50, 50, 50), (self.x, self.y - 10, self.width, 5))
-        pygame.draw.rect(screen, (0, 100, 255), (self.x, self.y - 10, self.width * hp_ratio, 5))
\ No newline at end of file
+        self.hp_bar.render(queue, (self.x, self.y - 10), hp_ratio)
\ No newline at end of file
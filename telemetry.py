@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import random
+import tracemalloc
+
+# === Telemetria ===
+# Samples how much a fight is holding on to, to catch containers that grow
+# during long sessions:
+#   live entries and allocated slots of every entity container (shots,
+#   minions, salsa drops, slime balls, fire lines, a summoned Sir Blub's
+#   minions), surface memory of each entity's animations, the shared
+#   caches (assets, pre-rendered shapes) and, when tracemalloc is on, the
+#   Python heap growth since the level started.
+# The level loop feeds sample() to the F3 profiler overlay; run as a script
+# it is a soak test: minutes of headless fights, failing when a container
+# is still above its limit at the end.
+SAMPLE_FRAMES = 60  # gameloop samples about once a second
+SOAK_MINUTES = 10
+# Live entries a container may hold at the end of a soak
+SOAK_LIMITS = {
+    "projectiles": 16,
+    "minions": 32,
+    "salsa_projectiles": 32,
+    "slime_balls": 32,
+    "fire_lines": 8,
+}
+CONTAINERS = ("minions", "salsa_projectiles", "slime_balls", "fire_lines")
+
+
+def capacity(container):
+    """Slots a container has allocated, live or not."""
+    for name in ("active", "alive"):
+        array = getattr(container, name, None)
+        if array is not None:
+            return len(array)
+    return len(container)
+
+
+def containers(bloop, boss):
+    """name -> (live entries, allocated slots) for every container in the fight."""
+    found = {"Bloop.projectiles": bloop.projectiles}
+    owners = [boss]
+    summoned = getattr(boss, "spawned_sir_blub", None)
+    if summoned is not None:
+        owners.append(summoned)
+    for owner in owners:
+        prefix = type(boss).__name__ if owner is boss else f"{type(boss).__name__}.spawned_sir_blub"
+        for attr in CONTAINERS:
+            container = getattr(owner, attr, None)
+            if container is not None:
+                found[f"{prefix}.{attr}"] = container
+    return {name: (len(container), capacity(container)) for name, container in found.items()}
+
+
+def animation_bytes(entity):
+    """Pixel bytes of the surfaces in entity.animations (shared ones included)."""
+    import assets
+    total = 0
+    for frames in entity.animations.values():
+        for surface in (frames if isinstance(frames, (list, tuple)) else [frames]):
+            if surface is not None:
+                total += assets.surface_bytes(surface)
+    return total
+
+
+def caches():
+    import assets
+    import render
+    return {
+        "assets.surfaces": len(assets.cache.surfaces),
+        "assets.derived_kb": assets.derived.bytes // 1024,
+        "render.solid": render.solid.cache_info().currsize,
+    }
+
+
+class Telemetry:
+    """Samples one level; heap growth is measured from its start."""
+    def __init__(self, bloop, boss):
+        self.bloop = bloop
+        self.boss = boss
+        self.heap_start = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self.animations_kb = {type(entity).__name__: animation_bytes(entity) // 1024
+                              for entity in (bloop, boss)}
+
+    def sample(self):
+        """Flat name -> value gauges, for the profiler overlay and reports."""
+        gauges = {name: live for name, (live, _) in containers(self.bloop, self.boss).items()}
+        gauges.update(caches())
+        for name, kb in self.animations_kb.items():
+            gauges[f"{name}.animations_kb"] = kb
+        if self.heap_start is not None:
+            gauges["heap_delta_kb"] = (tracemalloc.get_traced_memory()[0] - self.heap_start) // 1024
+        return gauges
+
+
+# === Soak test ===
+def soak(level, minutes=SOAK_MINUTES, seed=0, limits=SOAK_LIMITS, top=5):
+    """Plays minutes of a level headless, nobody dying; returns a report."""
+    import simulate
+    import benchmark
+    import gameloop
+    import collision
+    import simclock
+    import window
+    from bloop import Bloop
+    window.open()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    clock = simclock.VirtualClock()
+    boss = simulate.LEVELS[level](400, simulate.HEIGHT - 64, clock, random.Random(seed))
+    bloop = Bloop(100, simulate.HEIGHT - 64, clock)
+    telemetry = Telemetry(bloop, boss)
+    stage = collision.CollisionStage()
+    summon_stage = collision.CollisionStage()
+    keys = simulate.RandomInput(seed)
+    peak = {}
+    ticks = int(minutes * 60 * gameloop.LOGIC_HZ)
+    for tick in range(ticks):
+        benchmark.keep_alive(bloop, boss)
+        clock.advance(gameloop.STEP_MS)
+        bloop.update(keys.next())
+        boss.update(bloop)
+        stage.run(bloop, boss)
+        summon = boss.summoned()
+        if summon is not None:
+            summon.update(bloop)
+            summon_stage.run(bloop, summon)
+        if tick % SAMPLE_FRAMES == 0:
+            for name, (live, _) in containers(bloop, boss).items():
+                peak[name] = max(peak.get(name, 0), live)
+    final = containers(bloop, boss)
+    growth = tracemalloc.take_snapshot().compare_to(before, "lineno")[:top]
+    gauges = telemetry.sample()
+    tracemalloc.stop()
+    failures = [f"{name}: {live} live > {limits[name.rsplit('.', 1)[1]]}"
+                for name, (live, _) in final.items()
+                if live > limits.get(name.rsplit(".", 1)[1], float("inf"))]
+    return {
+        "level": level,
+        "minutes": minutes,
+        "ticks": ticks,
+        "final": {name: {"live": live, "slots": slots} for name, (live, slots) in final.items()},
+        "peak": peak,
+        "gauges": gauges,
+        "heap_growth": [{"where": str(stat.traceback), "kb": stat.size_diff // 1024,
+                         "blocks": stat.count_diff} for stat in growth],
+        "failures": failures,
+    }
+
+
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Soak test: long headless fights, checking container growth")
+    parser.add_argument("--level", type=int, action="append", choices=[1, 2, 3],
+                        help="level to soak, repeatable (default: all)")
+    parser.add_argument("--minutes", type=float, default=SOAK_MINUTES, help="simulated minutes per level")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--limit", action="append", default=[], metavar="CONTAINER=N",
+                        help="override a limit, e.g. minions=64")
+    args = parser.parse_args(argv)
+
+    limits = dict(SOAK_LIMITS)
+    for item in args.limit:
+        name, value = item.split("=")
+        limits[name] = int(value)
+    reports = [soak(level, args.minutes, args.seed, limits) for level in (args.level or [1, 2, 3])]
+    print(json.dumps(reports, indent=2))
+    failures = [f"level {r['level']}: {failure}" for r in reports for failure in r["failures"]]
+    if failures:
+        print("Soak failed:\n  " + "\n  ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # stdout is JSON
+    main(sys.argv[1:])
@@ -0,0 +1,128 @@
+import gc
+import json
+import threading
+import time
+import importlib
+from collections import deque
+
+# === Tracce per chrome://tracing / Perfetto ===
+# A Tracer collects spans (name, category, start, duration, thread) while a
+# level runs and streams them to a trace-event JSON file that Chrome's
+# about:tracing or ui.perfetto.dev open as a timeline. The game thread only
+# appends a tuple to a bounded deque; a writer thread drains it every
+# FLUSH_SECONDS, formats the events and writes them. If the writer falls
+# behind, the oldest spans are dropped (and counted) instead of blocking
+# the frame. Sources:
+#   frame sections  the level loop's profiler.FrameProfiler sections
+#   entities        update() of every class in HOOKS, wrapped by install();
+#                   Bloop's and the boss's updates are already frame sections
+#   assets          AssetCache.image / TransformCache.get (loads and hits)
+#   gc              collector pauses, from gc.callbacks
+CAPACITY = 65536  # spans buffered before the oldest are dropped
+FLUSH_SECONDS = 0.1
+# (module, class, method) wrapped by install() while tracing; only what the
+# level loop does not time itself, so no call shows up as two spans
+HOOKS = [
+    ("reglobulus", "FireLine", "update"),
+    ("miniBlub", "MiniBlubSwarm", "update"),
+    ("hazards", "HazardField", "update"),  # salsa drops and slime balls
+    ("assets", "AssetCache", "image"),
+    ("assets", "TransformCache", "get"),
+]
+CATEGORIES = {"assets": "assets"}  # module -> category; "entity" otherwise
+
+
+class Tracer:
+    def __init__(self, path, capacity=CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self.events = deque(maxlen=capacity)  # (name, cat, start, duration, tid, args)
+        self.dropped = 0
+        self.written = 0
+        self.origin = time.perf_counter()
+        self.patches = []  # (cls, method, original) undone by uninstall()
+        self.gc_start = None
+        self.file = open(path, "w")
+        self.file.write("[\n")
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+        self.thread.start()
+
+    def complete(self, name, start, end, cat="frame", args=None):
+        """Records a span from start to end, both time.perf_counter() values."""
+        if len(self.events) == self.capacity:
+            self.dropped += 1
+        self.events.append((name, cat, start, end - start, threading.get_ident(), args))
+
+    # === Aggancio alle entità ===
+    def install(self, hooks=HOOKS):
+        """Wraps every hooked method so each call is recorded as a span."""
+        for module, cls_name, method in hooks:
+            cls = getattr(importlib.import_module(module), cls_name)
+            self.wrap(cls, method, f"{cls_name}.{method}", CATEGORIES.get(module, "entity"))
+        gc.callbacks.append(self._gc)
+
+    def wrap(self, cls, method, name, cat):
+        original = getattr(cls, method)
+        perf = time.perf_counter
+        tracer = self
+
+        def traced(*args, **kwargs):
+            start = perf()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                tracer.complete(name, start, perf(), cat)
+        traced.__wrapped__ = original
+        setattr(cls, method, traced)
+        self.patches.append((cls, method, original))
+
+    def uninstall(self):
+        for cls, method, original in reversed(self.patches):
+            setattr(cls, method, original)
+        self.patches.clear()
+        if self._gc in gc.callbacks:
+            gc.callbacks.remove(self._gc)
+
+    def _gc(self, phase, info):
+        if phase == "start":
+            self.gc_start = time.perf_counter()
+        elif self.gc_start is not None:
+            self.complete("gc", self.gc_start, time.perf_counter(), "gc",
+                          {"generation": info["generation"], "collected": info["collected"]})
+            self.gc_start = None
+
+    # === Scrittura ===
+    def _drain(self):
+        events = self.events
+        origin = self.origin
+        lines = []
+        while events:
+            name, cat, start, duration, tid, args = events.popleft()
+            event = {"name": name, "cat": cat, "ph": "X", "pid": 1, "tid": tid,
+                     "ts": round((start - origin) * 1e6, 1), "dur": round(duration * 1e6, 1)}
+            if args:
+                event["args"] = args
+            lines.append(json.dumps(event))
+        if lines:
+            self.file.write(",\n".join(lines) + ",\n")
+            self.written += len(lines)
+
+    def _write_loop(self):
+        while not self.stopping.wait(FLUSH_SECONDS):
+            self._drain()
+
+    def close(self):
+        """Stops tracing, writes what is left and closes the file."""
+        self.uninstall()
+        self.stopping.set()
+        self.thread.join()
+        self._drain()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        meta = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                for tid, name in names.items()]
+        meta.append({"name": "dropped_spans", "ph": "i", "s": "g", "pid": 1, "tid": 0,
+                     "ts": round((time.perf_counter() - self.origin) * 1e6, 1),
+                     "args": {"dropped": self.dropped}})
+        self.file.write(",\n".join(json.dumps(event) for event in meta) + "\n]\n")
+        self.file.close()
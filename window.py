@@ -0,0 +1,31 @@
+import pygame
+
+# === Finestra di gioco ===
+# The menu and every level draw on the same 800x600 window, opened once per
+# process by the first open() call rather than at import time, so importing
+# a level or an entity module never touches SDL. Only the modules the game
+# uses are initialised (display and font): the game has no sound, and the
+# mixer is the slowest part of pygame.init() on a cold start. Headless tools
+# select the dummy video driver before calling open().
+WIDTH, HEIGHT = 800, 600
+
+screen = None
+
+
+def open(caption=None):
+    """Returns the game window, initialising pygame and opening it the first time."""
+    global screen
+    if screen is None:
+        pygame.display.init()
+        pygame.font.init()
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    if caption is not None:
+        pygame.display.set_caption(caption)
+    return screen
+
+
+def close():
+    """Shuts pygame down; the next open() starts over."""
+    global screen
+    screen = None
+    pygame.quit()